@@ -1,48 +1,309 @@
 '''
 Business: Генератор новостей - создаёт новости по запросу или в фоновом режиме каждые 30 секунд
-Args: event - dict с httpMethod, queryStringParameters (action=generate для ручной генерации)
+Args: event - dict с httpMethod, queryStringParameters (action=generate для ручной генерации, action=worker для разбора очереди, action=batch&size=K для пакетной генерации)
       context - object с request_id, function_name
 Returns: HTTP response с результатом генерации
 '''
 
 import json
 import os
+import re
+import zlib
+import hashlib
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any
-from datetime import datetime
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+ALL_CATEGORIES = ['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта']
+OPENROUTER_URL = os.environ.get('OPENROUTER_URL', 'https://openrouter.ai/api/v1/chat/completions')
+STREAM_COMPLETIONS = os.environ.get('OPENROUTER_STREAM', 'true').lower() != 'false'
+TITLE_FIELD_PATTERN = re.compile(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+BULK_CONCURRENCY = 8
+MAX_BULK_CONCURRENCY = 16
+BATCH_SIZE = 3
+MAX_BATCH_SIZE = 5
+WRITE_BATCH_SIZE = 8
+BATCH_MAX_TOKENS = 8000
+
+HTTP_TIMEOUT_SECONDS = 25
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8
+RUN_DEADLINE_SECONDS = 28
+
+WORKER_CONCURRENCY = 4
+WORKER_TIME_BUDGET_SECONDS = 20
+JOB_STALE_MINUTES = 5
+MAX_JOB_ATTEMPTS = 3
+JOB_RETRY_BASE_SECONDS = 60
+JOB_RETRY_MAX_SECONDS = 900
+
+GENERATION_LOCK_KEY = 74494482
+GLOBAL_ARTICLES_PER_MINUTE = 20
+CATEGORY_ARTICLES_PER_MINUTE = 4
+
+SHINGLE_SIZE = 5
+MINHASH_PRIME = (1 << 31) - 1
+LSH_BANDS = 16
+LSH_ROWS = 4
+SIMILARITY_THRESHOLD = 0.5
+SIMILARITY_WINDOW_DAYS = 14
+_minhash_rng = random.Random(74494482)
+MINHASH_PERMUTATIONS = [
+    (_minhash_rng.randrange(1, MINHASH_PRIME), _minhash_rng.randrange(0, MINHASH_PRIME))
+    for _ in range(LSH_BANDS * LSH_ROWS)
+]
+
+_db_connection = None
+_db_lock = threading.Lock()
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_BULK_CONCURRENCY))
+_http_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_BULK_CONCURRENCY))
+_run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+def start_run_deadline() -> None:
+    global _run_deadline
+    _run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+def retry_after_seconds(response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_seconds(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def http_post(url: str, **kwargs):
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        remaining = _run_deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout('Run deadline exceeded before the request could be sent')
+        
+        try:
+            response = _http_session.post(url, timeout=min(HTTP_TIMEOUT_SECONDS, remaining), **kwargs)
+        except (requests.ConnectTimeout, requests.ConnectionError):
+            delay = backoff_seconds(attempt)
+            if attempt == HTTP_MAX_RETRIES or time.monotonic() + delay >= _run_deadline:
+                raise
+            time.sleep(delay)
+            continue
+        
+        if response.status_code not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+            return response
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = backoff_seconds(attempt)
+        if time.monotonic() + delay >= _run_deadline:
+            return response
+        response.close()
+        time.sleep(delay)
+
+def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    database_url = os.environ.get('DATABASE_URL')
+    _db_connection = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
+
+class GenerationRateLimited(Exception):
+    pass
+
+def try_acquire_generation_lock(cursor, conn) -> bool:
+    cursor.execute('SELECT pg_try_advisory_lock(%s) AS locked', (GENERATION_LOCK_KEY,))
+    locked = cursor.fetchone()['locked']
+    conn.commit()
+    return locked
+
+def release_generation_lock(conn) -> None:
+    try:
+        conn.rollback()
+        lock_cursor = conn.cursor()
+        lock_cursor.execute('SELECT pg_advisory_unlock(%s)', (GENERATION_LOCK_KEY,))
+        lock_cursor.close()
+        conn.commit()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+def take_rate_token(cursor, bucket_key: str, per_minute: int) -> bool:
+    cursor.execute("""
+        INSERT INTO t_p74494482_auto_seo_news_site.generation_rate_buckets AS b (bucket_key, tokens, updated_at)
+        VALUES (%(key)s, %(capacity)s - 1, NOW())
+        ON CONFLICT (bucket_key) DO UPDATE
+        SET tokens = LEAST(%(capacity)s, b.tokens + EXTRACT(EPOCH FROM NOW() - b.updated_at) * %(rate)s) - 1,
+            updated_at = NOW()
+        WHERE LEAST(%(capacity)s, b.tokens + EXTRACT(EPOCH FROM NOW() - b.updated_at) * %(rate)s) >= 1
+        RETURNING tokens
+    """, {'key': bucket_key, 'capacity': per_minute, 'rate': per_minute / 60.0})
+    return cursor.fetchone() is not None
+
+def take_generation_token(cursor, conn, category: str) -> bool:
+    allowed = (
+        take_rate_token(cursor, f'category:{category}', CATEGORY_ARTICLES_PER_MINUTE)
+        and take_rate_token(cursor, 'global', GLOBAL_ARTICLES_PER_MINUTE)
+    )
+    if allowed:
+        conn.commit()
+    else:
+        conn.rollback()
+    return allowed
 
 def get_random_image(category: str) -> str:
     random_num = random.randint(1, 999)
     return f'https://picsum.photos/seed/{random_num}/800/400'
 
-def escape_string(value: str) -> str:
-    return value.replace("'", "''")
-
 def create_slug(title: str) -> str:
     slug = title.lower()
     slug = ''.join(c if c.isalnum() or c.isspace() else '' for c in slug)
     slug = '-'.join(slug.split())
     return slug[:100]
 
+def insert_news_with_unique_slug(cursor, columns: Dict[str, Any], base_slug: str, max_attempts: int = 5):
+    column_names = list(columns.keys())
+    query = f'''
+        WITH next_slug AS (
+            SELECT CASE
+                WHEN NOT COALESCE(bool_or(slug = %(base_slug)s), FALSE) THEN %(base_slug)s
+                ELSE %(base_slug)s || '-' || (COALESCE(MAX(
+                    CASE WHEN substring(slug FROM char_length(%(base_slug)s) + 2) ~ '^[0-9]{{1,9}}$'
+                         THEN substring(slug FROM char_length(%(base_slug)s) + 2)::int
+                    END
+                ), 0) + 1)
+            END AS slug
+            FROM t_p74494482_auto_seo_news_site.news
+            WHERE slug = %(base_slug)s OR slug LIKE %(base_slug)s || '-%%'
+        )
+        INSERT INTO t_p74494482_auto_seo_news_site.news ({', '.join(column_names)}, slug)
+        SELECT {', '.join(f'%({name})s' for name in column_names)}, next_slug.slug
+        FROM next_slug
+        ON CONFLICT (slug) DO NOTHING
+        RETURNING id, slug
+    '''
+    
+    for attempt in range(max_attempts):
+        cursor.execute(query, {**columns, 'base_slug': base_slug})
+        result = cursor.fetchone()
+        if result is not None:
+            return result
+    
+    raise RuntimeError(f'Could not allocate a unique slug for "{base_slug}"')
+
 def title_exists(cursor, title: str) -> bool:
-    escaped_title = escape_string(title)
     cursor.execute(
-        f"SELECT COUNT(*) as cnt FROM t_p74494482_auto_seo_news_site.news WHERE title = '{escaped_title}'"
+        "SELECT 1 FROM t_p74494482_auto_seo_news_site.news "
+        "WHERE title_fingerprint = t_p74494482_auto_seo_news_site.news_title_fingerprint(%s) LIMIT 1",
+        (title,)
     )
-    result = cursor.fetchone()
-    return result['cnt'] > 0
+    return cursor.fetchone() is not None
 
-def generate_single_news(cursor, conn, api_key: str) -> bool:
-    all_categories = ['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта']
-    category = random.choice(all_categories)
-    
-    max_attempts = 3
-    
-    for attempt in range(max_attempts):
-        prompt = f"""Создай новость категории "{category}" в JSON:
+def text_shingles(text: str) -> set:
+    words = re.findall(r'\w+', text.lower().replace('ё', 'е'))
+    normalized = ' '.join(words)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(text: str) -> List[int]:
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in text_shingles(text)]
+    if not hashes:
+        return [MINHASH_PRIME - 1] * len(MINHASH_PERMUTATIONS)
+    return [min((a * h + b) % MINHASH_PRIME for h in hashes) for a, b in MINHASH_PERMUTATIONS]
+
+def lsh_buckets(signature: List[int]) -> List[int]:
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.md5(','.join(map(str, rows)).encode('utf-8')).digest()
+        buckets.append(int.from_bytes(digest[:8], 'big', signed=True))
+    return buckets
+
+def signature_similarity(left: List[int], right: List[int]) -> float:
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+def similar_news_exists(cursor, category: str, signature: List[int]) -> bool:
+    buckets = lsh_buckets(signature)
+    cursor.execute(
+        f"""
+        SELECT DISTINCT n.id, n.minhash_signature
+        FROM t_p74494482_auto_seo_news_site.news_lsh_buckets b
+        JOIN t_p74494482_auto_seo_news_site.news n ON n.id = b.news_id
+        WHERE (b.band, b.bucket) IN ({', '.join(['(%s, %s)'] * len(buckets))})
+          AND b.category = %s
+          AND b.published_at > NOW() - INTERVAL '{SIMILARITY_WINDOW_DAYS} days'
+        """,
+        [value for band, bucket in enumerate(buckets) for value in (band, bucket)] + [category]
+    )
+    return any(
+        row['minhash_signature'] and signature_similarity(signature, row['minhash_signature']) >= SIMILARITY_THRESHOLD
+        for row in cursor.fetchall()
+    )
+
+def store_lsh_buckets(cursor, entries: List[Tuple[int, str, datetime, List[int]]]) -> None:
+    execute_values(
+        cursor,
+        "INSERT INTO t_p74494482_auto_seo_news_site.news_lsh_buckets (news_id, band, bucket, category, published_at) VALUES %s",
+        [
+            (news_id, band, bucket, category, published_at)
+            for news_id, category, published_at, signature in entries
+            for band, bucket in enumerate(lsh_buckets(signature))
+        ]
+    )
+
+def title_fingerprint(title: str) -> str:
+    return hashlib.md5(re.sub(r'[\W_]+', '', title.lower().replace('ё', 'е')).encode('utf-8')).hexdigest()
+
+def build_news_prompt(category: str) -> str:
+    return f"""Создай новость категории "{category}" в JSON:
 {{
   "title": "Заголовок (50-60 символов)",
   "excerpt": "Краткое описание (200-250 символов)",
@@ -54,104 +315,490 @@ def generate_single_news(cursor, conn, api_key: str) -> bool:
 
 Требования: актуальность октябрь 2025, уникальный заголовок, естественный язык."""
 
-        response = requests.post(
-            'https://openrouter.ai/api/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'deepseek/deepseek-chat',
-                'messages': [
-                    {'role': 'system', 'content': 'Ты опытный журналист топовых российских СМИ. Пишешь уникальные актуальные новости.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                'temperature': 0.9,
-                'max_tokens': 3000
-            },
-            timeout=25
-        )
-        
+def build_batch_prompt(categories: List[str]) -> str:
+    category_list = ', '.join(f'"{category}"' for category in categories)
+    return f"""Создай {len(categories)} разных новостей в JSON-массиве, по одной для каждой категории по порядку: {category_list}.
+[
+  {{
+    "category": "Категория из списка",
+    "title": "Заголовок (50-60 символов)",
+    "excerpt": "Краткое описание (200-250 символов)",
+    "content": "Подробный текст из 6-8 абзацев по 4-5 предложений. Добавь цитаты, статистику, факты.",
+    "meta_title": "SEO заголовок (50-60 символов)",
+    "meta_description": "SEO описание (150-160 символов)",
+    "meta_keywords": "ключ1, ключ2, ключ3, ключ4, ключ5"
+  }}
+]
+
+Требования: актуальность октябрь 2025, уникальные заголовки и сюжеты, естественный язык. Ответь только JSON-массивом."""
+
+def build_completion_request(prompt: str, stream: bool, max_tokens: int = 3000) -> Dict[str, Any]:
+    return {
+        'model': 'deepseek/deepseek-chat',
+        'messages': [
+            {'role': 'system', 'content': 'Ты опытный журналист топовых российских СМИ. Пишешь уникальные актуальные новости.'},
+            {'role': 'user', 'content': prompt}
+        ],
+        'temperature': 0.9,
+        'max_tokens': max_tokens,
+        'stream': stream
+    }
+
+def request_news_data(api_key: str, category: str) -> Optional[Dict[str, Any]]:
+    response = http_post(
+        OPENROUTER_URL,
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        },
+        json=build_completion_request(build_news_prompt(category), stream=False)
+    )
+    
+    response.raise_for_status()
+    result = response.json()
+    
+    content_text = result['choices'][0]['message']['content'].strip()
+    if content_text.startswith('```json'):
+        content_text = content_text[7:]
+    if content_text.startswith('```'):
+        content_text = content_text[3:]
+    if content_text.endswith('```'):
+        content_text = content_text[:-3]
+    
+    content_text = content_text.strip()
+    
+    try:
+        return json.loads(content_text)
+    except json.JSONDecodeError:
+        first_brace = content_text.find('{')
+        last_brace = content_text.rfind('}')
+        if first_brace != -1 and last_brace != -1:
+            return json.loads(content_text[first_brace:last_brace+1])
+        return None
+
+def iter_completion_content(response, usage: Dict[str, Any]):
+    for raw_line in response.iter_lines():
+        line = raw_line.decode('utf-8')
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        chunk = json.loads(data)
+        usage.update(chunk.get('usage') or {})
+        choices = chunk.get('choices') or [{}]
+        yield (choices[0].get('delta') or {}).get('content') or ''
+
+def stream_news_data(api_key: str, category: str, title_taken: Callable[[str], bool]) -> Optional[Dict[str, Any]]:
+    response = http_post(
+        OPENROUTER_URL,
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        },
+        json=build_completion_request(build_news_prompt(category), stream=True),
+        stream=True
+    )
+    
+    try:
         response.raise_for_status()
-        result = response.json()
-        
-        content_text = result['choices'][0]['message']['content'].strip()
-        if content_text.startswith('```json'):
-            content_text = content_text[7:]
-        if content_text.startswith('```'):
-            content_text = content_text[3:]
-        if content_text.endswith('```'):
-            content_text = content_text[:-3]
-        
-        content_text = content_text.strip()
-        
-        try:
-            news_data = json.loads(content_text)
-        except json.JSONDecodeError:
-            first_brace = content_text.find('{')
-            last_brace = content_text.rfind('}')
-            if first_brace != -1 and last_brace != -1:
-                content_text = content_text[first_brace:last_brace+1]
-                news_data = json.loads(content_text)
-            else:
-                continue
+        content_text = ''
+        object_start = -1
+        scanned = 0
+        depth = 0
+        in_string = False
+        escaped = False
+        title_checked = False
         
+        for delta in iter_completion_content(response, {}):
+            content_text += delta
+            
+            while scanned < len(content_text):
+                char = content_text[scanned]
+                if object_start == -1:
+                    if char == '{':
+                        object_start, depth = scanned, 1
+                elif in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == '\\':
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char == '{':
+                    depth += 1
+                elif char == '}':
+                    depth -= 1
+                    if depth == 0:
+                        return json.loads(content_text[object_start:scanned + 1])
+                scanned += 1
+            
+            if not title_checked and object_start != -1:
+                match = TITLE_FIELD_PATTERN.search(content_text, object_start)
+                if match:
+                    title_checked = True
+                    if title_taken(json.loads(f'"{match.group(1)}"')):
+                        return None
+    finally:
+        response.close()
+    
+    return None
+
+def request_batch_data(api_key: str, categories: List[str]) -> Tuple[List[Any], Dict[str, Any]]:
+    response = http_post(
+        OPENROUTER_URL,
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        },
+        json=build_completion_request(
+            build_batch_prompt(categories),
+            stream=True,
+            max_tokens=min(3000 * len(categories), BATCH_MAX_TOKENS)
+        ),
+        stream=True
+    )
+    
+    usage: Dict[str, Any] = {}
+    try:
+        response.raise_for_status()
+        content_text = ''.join(iter_completion_content(response, usage)).strip()
+    finally:
+        response.close()
+    
+    if content_text.startswith('```json'):
+        content_text = content_text[7:]
+    if content_text.startswith('```'):
+        content_text = content_text[3:]
+    if content_text.endswith('```'):
+        content_text = content_text[:-3]
+    
+    try:
+        items = json.loads(content_text.strip())
+    except json.JSONDecodeError:
+        first_bracket = content_text.find('[')
+        last_bracket = content_text.rfind(']')
+        if first_bracket == -1 or last_bracket == -1:
+            return [], usage
+        items = json.loads(content_text[first_bracket:last_bracket+1])
+    
+    return (items if isinstance(items, list) else [items]), usage
+
+def build_news_columns(category: str, news_data: Dict[str, Any], signature: List[int], published_at: datetime) -> Dict[str, Any]:
+    title = news_data.get('title', 'Новость')
+    excerpt = news_data.get('excerpt', '')
+    content = news_data.get('content', '')
+    meta_title = news_data.get('meta_title', title)
+    meta_description = news_data.get('meta_description', excerpt)
+    meta_keywords = news_data.get('meta_keywords', category)
+    
+    return {
+        'title': title,
+        'excerpt': excerpt,
+        'content': content,
+        'category': category,
+        'image_url': get_random_image(category),
+        'published_at': published_at,
+        'is_hot': False,
+        'meta_title': meta_title,
+        'meta_description': meta_description,
+        'meta_keywords': meta_keywords,
+        'author': 'Редакция',
+        'minhash_signature': signature
+    }
+
+def save_news(cursor, conn, category: str, news_data: Dict[str, Any]) -> bool:
+    title = news_data.get('title', 'Новость')
+    
+    if title_exists(cursor, title):
+        return False
+    
+    signature = minhash_signature(f"{title} {news_data.get('excerpt', '')}")
+    if similar_news_exists(cursor, category, signature):
+        return False
+    
+    published_at = datetime.now()
+    inserted = insert_news_with_unique_slug(
+        cursor, build_news_columns(category, news_data, signature, published_at), create_slug(title)
+    )
+    store_lsh_buckets(cursor, [(inserted['id'], category, published_at, signature)])
+    conn.commit()
+    return True
+
+def allocate_slugs(cursor, base_slugs: List[str]) -> List[str]:
+    cursor.execute(
+        "SELECT slug FROM t_p74494482_auto_seo_news_site.news WHERE slug = ANY(%s) OR slug LIKE ANY(%s)",
+        (base_slugs, [f'{base_slug}-%' for base_slug in base_slugs])
+    )
+    taken = {row['slug'] for row in cursor.fetchall()}
+    
+    slugs = []
+    for base_slug in base_slugs:
+        slug = base_slug
+        if slug in taken:
+            suffixes = [
+                int(existing[len(base_slug) + 1:]) for existing in taken
+                if existing.startswith(f'{base_slug}-') and re.fullmatch(r'[0-9]{1,9}', existing[len(base_slug) + 1:])
+            ]
+            slug = f'{base_slug}-{max(suffixes, default=0) + 1}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+def insert_news_batch(cursor, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    column_names = list(rows[0].keys())
+    base_slugs = [create_slug(row['title']) for row in rows]
+    slugs = allocate_slugs(cursor, base_slugs)
+    
+    inserted = execute_values(
+        cursor,
+        f"""
+        INSERT INTO t_p74494482_auto_seo_news_site.news ({', '.join(column_names)}, slug)
+        VALUES %s
+        ON CONFLICT (slug) DO NOTHING
+        RETURNING id, slug
+        """,
+        [tuple(row[name] for name in column_names) + (slug,) for row, slug in zip(rows, slugs)],
+        fetch=True
+    )
+    inserted_by_slug = {row['slug']: row for row in inserted}
+    
+    return [
+        inserted_by_slug.get(slug) or insert_news_with_unique_slug(cursor, row, base_slug)
+        for row, slug, base_slug in zip(rows, slugs, base_slugs)
+    ]
+
+class NewsBatchWriter:
+    def __init__(self, cursor, conn, flush_size: int = WRITE_BATCH_SIZE):
+        self.cursor = cursor
+        self.conn = conn
+        self.flush_size = flush_size
+        self.rows: List[Dict[str, Any]] = []
+        self.fingerprints = set()
+        self.created = 0
+        self.rejected = 0
+    
+    def is_duplicate(self, category: str, title: str, signature: List[int]) -> bool:
+        return (
+            title_fingerprint(title) in self.fingerprints
+            or any(
+                row['category'] == category
+                and signature_similarity(signature, row['minhash_signature']) >= SIMILARITY_THRESHOLD
+                for row in self.rows
+            )
+            or title_exists(self.cursor, title)
+            or similar_news_exists(self.cursor, category, signature)
+        )
+    
+    def add(self, category: str, news_data: Dict[str, Any]) -> bool:
         title = news_data.get('title', 'Новость')
+        signature = minhash_signature(f"{title} {news_data.get('excerpt', '')}")
+        if self.is_duplicate(category, title, signature):
+            self.rejected += 1
+            return False
         
-        if title_exists(cursor, title):
+        self.fingerprints.add(title_fingerprint(title))
+        self.rows.append(build_news_columns(category, news_data, signature, datetime.now()))
+        if len(self.rows) >= self.flush_size:
+            self.flush()
+        return True
+    
+    def flush(self) -> None:
+        if self.rows:
+            inserted = insert_news_batch(self.cursor, self.rows)
+            store_lsh_buckets(self.cursor, [
+                (result['id'], row['category'], row['published_at'], row['minhash_signature'])
+                for result, row in zip(inserted, self.rows)
+            ])
+        self.conn.commit()
+        self.created += len(self.rows)
+        self.rows = []
+
+def validate_batch_article(item: Any, categories: List[str]) -> Optional[Dict[str, Any]]:
+    if not isinstance(item, dict) or item.get('category') not in categories:
+        return None
+    for field in ('title', 'excerpt', 'content'):
+        if not isinstance(item.get(field), str) or not item[field].strip():
+            return None
+    return item
+
+def generate_news_for_category(
+    cursor, conn, api_key: str, category: str,
+    accept: Optional[Callable[[str, Dict[str, Any]], bool]] = None
+) -> bool:
+    max_attempts = 3
+    
+    with _db_lock:
+        if not take_generation_token(cursor, conn, category):
+            raise GenerationRateLimited(f'Превышен лимит генерации для категории "{category}"')
+    
+    def title_taken(title: str) -> bool:
+        with _db_lock:
+            return title_exists(cursor, title)
+    
+    for attempt in range(max_attempts):
+        if STREAM_COMPLETIONS:
+            news_data = stream_news_data(api_key, category, title_taken)
+        else:
+            news_data = request_news_data(api_key, category)
+        if news_data is None:
             continue
         
-        excerpt = news_data.get('excerpt', '')
-        content = news_data.get('content', '')
-        meta_title = news_data.get('meta_title', title)
-        meta_description = news_data.get('meta_description', excerpt)
-        meta_keywords = news_data.get('meta_keywords', category)
-        
-        slug = create_slug(title)
-        slug_unique = slug
-        counter = 1
-        
-        while True:
-            escaped_slug = escape_string(slug_unique)
-            cursor.execute(
-                f"SELECT id FROM t_p74494482_auto_seo_news_site.news WHERE slug = '{escaped_slug}'"
-            )
-            if cursor.fetchone() is None:
-                break
-            slug_unique = f"{slug}-{counter}"
-            counter += 1
-        
-        image = get_random_image(category)
-        published_time = datetime.now().isoformat()
-        is_hot = random.choice([True, False, False, False])
-        
-        escaped_title = escape_string(title)
-        escaped_excerpt = escape_string(excerpt)
-        escaped_content = escape_string(content)
-        escaped_category = escape_string(category)
-        escaped_image = escape_string(image)
-        escaped_slug = escape_string(slug_unique)
-        escaped_meta_title = escape_string(meta_title)
-        escaped_meta_desc = escape_string(meta_description)
-        escaped_meta_keys = escape_string(meta_keywords)
-        escaped_time = escape_string(published_time)
-        
-        insert_query = f"""
-            INSERT INTO t_p74494482_auto_seo_news_site.news 
-            (title, excerpt, content, category, image_url, published_at, is_hot, 
-             meta_title, meta_description, meta_keywords, slug, author)
-            VALUES ('{escaped_title}', '{escaped_excerpt}', '{escaped_content}', 
-                    '{escaped_category}', '{escaped_image}', '{escaped_time}', {is_hot},
-                    '{escaped_meta_title}', '{escaped_meta_desc}', '{escaped_meta_keys}', 
-                    '{escaped_slug}', 'Редакция')
-        """
-        
-        cursor.execute(insert_query)
-        conn.commit()
-        return True
+        with _db_lock:
+            if accept is not None:
+                if accept(category, news_data):
+                    return True
+            elif save_news(cursor, conn, category, news_data):
+                return True
     
     return False
 
+def generate_single_news(cursor, conn, api_key: str) -> bool:
+    return generate_news_for_category(cursor, conn, api_key, random.choice(ALL_CATEGORIES))
+
+def generate_bulk_news(cursor, conn, api_key: str, concurrency: int) -> Dict[str, int]:
+    writer = NewsBatchWriter(cursor, conn)
+    news_failed = 0
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(generate_news_for_category, cursor, conn, api_key, category, writer.add)
+            for category in ALL_CATEGORIES * 2
+        ]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                news_failed += 1
+    
+    with _db_lock:
+        writer.flush()
+    
+    return {'created': writer.created, 'failed': news_failed}
+
+def claim_jobs(cursor, conn, limit: int) -> List[Dict[str, Any]]:
+    cursor.execute(f"""
+        UPDATE t_p74494482_auto_seo_news_site.generation_jobs
+        SET status = 'failed', outcome = 'abandoned', finished_at = NOW()
+        WHERE status = 'running'
+          AND started_at < NOW() - INTERVAL '{JOB_STALE_MINUTES} minutes'
+          AND attempts >= %s
+    """, (MAX_JOB_ATTEMPTS,))
+    cursor.execute(f"""
+        UPDATE t_p74494482_auto_seo_news_site.generation_jobs
+        SET status = 'running', attempts = attempts + 1, started_at = NOW()
+        WHERE id IN (
+            SELECT id FROM t_p74494482_auto_seo_news_site.generation_jobs
+            WHERE (status = 'pending' AND available_at <= NOW())
+               OR (status = 'running' AND started_at < NOW() - INTERVAL '{JOB_STALE_MINUTES} minutes')
+            ORDER BY created_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, category, attempts
+    """, (limit,))
+    jobs = cursor.fetchall()
+    conn.commit()
+    return jobs
+
+def finish_job(cursor, conn, job_id: int, status: str, outcome: str, latency_ms: int, error: Optional[str] = None) -> None:
+    cursor.execute("""
+        UPDATE t_p74494482_auto_seo_news_site.generation_jobs
+        SET status = %s, outcome = %s, latency_ms = %s, error = %s, finished_at = NOW()
+        WHERE id = %s
+    """, (status, outcome, latency_ms, error, job_id))
+    conn.commit()
+
+def requeue_job(cursor, conn, job: Dict[str, Any], latency_ms: int, error: str) -> None:
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(job['attempts'] - 1, 0))
+    try:
+        cursor.execute("""
+            UPDATE t_p74494482_auto_seo_news_site.generation_jobs
+            SET status = 'pending', outcome = 'rate_limited', latency_ms = %s, error = %s,
+                started_at = NULL, available_at = NOW() + %s * INTERVAL '1 second'
+            WHERE id = %s
+        """, (latency_ms, error, delay, job['id']))
+        conn.commit()
+    except psycopg2.IntegrityError:
+        conn.rollback()
+        finish_job(cursor, conn, job['id'], 'done', 'superseded', latency_ms, error)
+
+def run_job(cursor, conn, api_key: str, job: Dict[str, Any]) -> str:
+    category = job['category'] or random.choice(ALL_CATEGORIES)
+    if category not in ALL_CATEGORIES:
+        with _db_lock:
+            finish_job(cursor, conn, job['id'], 'failed', 'invalid_category', 0, f'Unknown category: {category[:100]}')
+        return 'invalid_category'
+    
+    started = time.monotonic()
+    try:
+        created = generate_news_for_category(cursor, conn, api_key, category)
+        status, outcome, error = 'done', 'created' if created else 'duplicate', None
+    except GenerationRateLimited as e:
+        status, outcome, error = 'pending', 'rate_limited', str(e)
+    except Exception as e:
+        status, outcome, error = 'failed', type(e).__name__, str(e)
+    
+    latency_ms = int((time.monotonic() - started) * 1000)
+    with _db_lock:
+        if status == 'pending':
+            requeue_job(cursor, conn, job, latency_ms, error)
+        else:
+            finish_job(cursor, conn, job['id'], status, outcome, latency_ms, error)
+    return outcome
+
+def drain_job_queue(cursor, conn, api_key: str, concurrency: int) -> Dict[str, int]:
+    deadline = time.monotonic() + WORKER_TIME_BUDGET_SECONDS
+    outcomes: Dict[str, int] = {}
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while time.monotonic() < deadline:
+            with _db_lock:
+                jobs = claim_jobs(cursor, conn, concurrency)
+            if not jobs:
+                break
+            for outcome in executor.map(lambda job: run_job(cursor, conn, api_key, job), jobs):
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    
+    return outcomes
+
+def generate_batch_news(cursor, conn, api_key: str, categories: List[str]) -> Dict[str, Any]:
+    started = time.monotonic()
+    
+    with _db_lock:
+        allowed = [category for category in categories if take_generation_token(cursor, conn, category)]
+    if not allowed:
+        raise GenerationRateLimited('Превышен лимит генерации для всех категорий пакета')
+    
+    items, usage = request_batch_data(api_key, allowed)
+    writer = NewsBatchWriter(cursor, conn, flush_size=MAX_BATCH_SIZE)
+    invalid = 0
+    
+    with _db_lock:
+        for item in items:
+            article = validate_batch_article(item, allowed)
+            if article is None:
+                invalid += 1
+                continue
+            writer.add(article['category'], article)
+        writer.flush()
+    
+    elapsed = time.monotonic() - started
+    return {
+        'requested': len(allowed),
+        'returned': len(items),
+        'created': writer.created,
+        'rejected': invalid + writer.rejected,
+        'elapsed_seconds': round(elapsed, 2),
+        'articles_per_minute': round(writer.created * 60 / elapsed, 2) if elapsed > 0 else 0,
+        'completion_tokens': usage.get('completion_tokens', 0),
+        'tokens_per_article': round(usage.get('completion_tokens', 0) / writer.created, 1) if writer.created else None
+    }
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
@@ -168,6 +815,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
+    start_run_deadline()
+    locked_conn = None
     try:
         db_url = os.environ.get('DATABASE_URL')
         api_key = os.environ.get('DEEPSEEK_API_KEY')
@@ -186,14 +835,80 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         params = event.get('queryStringParameters') or {}
         action = params.get('action', 'auto')
         
-        conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
+        conn = get_db_connection()
         cursor = conn.cursor()
         
-        if action == 'auto' or method == 'GET':
+        if action in ('worker', 'auto', 'bulk', 'batch') or method == 'GET':
+            if not try_acquire_generation_lock(cursor, conn):
+                cursor.close()
+                release_db_connection(conn)
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({
+                        'success': False,
+                        'status': 'already_running',
+                        'message': 'Генерация уже выполняется'
+                    }),
+                    'isBase64Encoded': False
+                }
+            locked_conn = conn
+        
+        if action == 'worker':
+            concurrency = max(1, min(int(params.get('concurrency', WORKER_CONCURRENCY)), MAX_BULK_CONCURRENCY))
+            outcomes = drain_job_queue(cursor, conn, api_key, concurrency)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'success': True,
+                    'processed': sum(outcomes.values()),
+                    'outcomes': outcomes
+                }),
+                'isBase64Encoded': False
+            }
+        
+        elif action == 'batch':
+            size = max(1, min(int(params.get('size', BATCH_SIZE)), MAX_BATCH_SIZE))
+            category = params.get('category')
+            if category in ALL_CATEGORIES:
+                categories = [category] * size
+            else:
+                categories = random.sample(ALL_CATEGORIES, size)
+            batch_result = generate_batch_news(cursor, conn, api_key, categories)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'success': batch_result['created'] > 0,
+                    **batch_result,
+                    'message': f"Создано {batch_result['created']} новостей из {batch_result['requested']}"
+                }),
+                'isBase64Encoded': False
+            }
+        
+        elif action == 'auto' or method == 'GET':
             success = generate_single_news(cursor, conn, api_key)
             
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             if success:
                 return {
@@ -223,15 +938,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 }
         
         elif action == 'bulk':
-            all_categories = ['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта']
-            news_created = 0
-            
-            for _ in range(len(all_categories) * 2):
-                if generate_single_news(cursor, conn, api_key):
-                    news_created += 1
+            concurrency = max(1, min(int(params.get('concurrency', BULK_CONCURRENCY)), MAX_BULK_CONCURRENCY))
+            bulk_result = generate_bulk_news(cursor, conn, api_key, concurrency)
+            news_created = bulk_result['created']
             
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 200,
@@ -242,6 +954,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'body': json.dumps({
                     'success': True,
                     'created': news_created,
+                    'failed': bulk_result['failed'],
                     'message': f'Создано {news_created} новостей'
                 }),
                 'isBase64Encoded': False
@@ -249,7 +962,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         else:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             return {
                 'statusCode': 400,
                 'headers': {
@@ -260,6 +973,22 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'isBase64Encoded': False
             }
             
+    except GenerationRateLimited as e:
+        return {
+            'statusCode': 429,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Retry-After': '60'
+            },
+            'body': json.dumps({
+                'success': False,
+                'status': 'rate_limited',
+                'message': str(e)
+            }),
+            'isBase64Encoded': False
+        }
+    
     except Exception as e:
         return {
             'statusCode': 500,
@@ -270,3 +999,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': str(e), 'type': type(e).__name__}),
             'isBase64Encoded': False
         }
+    
+    finally:
+        if locked_conn is not None:
+            release_generation_lock(locked_conn)
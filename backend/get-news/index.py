@@ -1,18 +1,265 @@
 '''
 Business: Прокси для получения новостей напрямую из БД (обходит проблемы с CORS)
-Args: event - dict с httpMethod, queryStringParameters (category, limit, offset, id)
+Args: event - dict с httpMethod, queryStringParameters (category, limit, offset, cursor, since, view=full, fields, id, slug, include, q, sort=trending, facets=1)
       context - object с request_id
 Returns: HTTP response с новостями из базы данных
 '''
 
 import json
 import os
+import base64
+import hashlib
+import threading
+import time
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 
-def escape_string(value: str) -> str:
-    return value.replace("'", "''")
+FIELD_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'content': 'content',
+    'category': 'category',
+    'image': 'image_url',
+    'author': 'author',
+    'time': 'published_at',
+    'isHot': 'is_hot',
+    'views': 'views_count',
+    'slug': 'slug',
+    'metaTitle': 'meta_title',
+    'metaDescription': 'meta_description'
+}
+
+FULL_FIELDS = list(FIELD_COLUMNS.keys())
+CARD_FIELDS = [field for field in FULL_FIELDS if field != 'content']
+
+RELATED_LIMIT = 3
+
+CACHE_TTL_SECONDS = 15
+CACHE_MAX_ENTRIES = 256
+
+_db_connection = None
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    database_url = os.environ.get('DATABASE_URL')
+    _db_connection = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
+
+def encode_cursor(published_at: datetime, news_id: int) -> str:
+    raw = json.dumps([published_at.isoformat(), news_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor_value: str) -> Tuple[datetime, int]:
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    published_at, news_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    return datetime.fromisoformat(published_at), int(news_id)
+
+def encode_search_cursor(rank: float, news_id: int) -> str:
+    raw = json.dumps([rank, news_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_search_cursor(cursor_value: str) -> Tuple[float, int]:
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    rank, news_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    return float(rank), int(news_id)
+
+def parse_since(since_value: str) -> Tuple[str, Any]:
+    if since_value.isdigit():
+        return 'id', int(since_value)
+    try:
+        return 'watermark', decode_cursor(since_value)
+    except (ValueError, TypeError):
+        pass
+    watermark = datetime.fromisoformat(since_value.replace('Z', '+00:00'))
+    if watermark.tzinfo is not None:
+        watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+    return 'watermark', (watermark, 0)
+
+def resolve_fields(params: Dict[str, Any]) -> List[str]:
+    fields_param = params.get('fields')
+    if fields_param:
+        requested = [field.strip() for field in fields_param.split(',')]
+        fields = [field for field in FULL_FIELDS if field in requested]
+        for required in ('time', 'id'):
+            if required not in fields:
+                fields.insert(0, required)
+        return fields
+    if params.get('view') == 'full':
+        return FULL_FIELDS
+    return CARD_FIELDS
+
+def select_columns(fields: List[str]) -> str:
+    return ', '.join(FIELD_COLUMNS[field] for field in fields)
+
+def format_news(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    news_item = {}
+    for field in fields:
+        value = item[FIELD_COLUMNS[field]]
+        if field == 'time':
+            value = value.isoformat() if value else None
+        news_item[field] = value
+    return news_item
+
+def load_related(cursor, news_item: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    cursor.execute(
+        f"""SELECT {select_columns(CARD_FIELDS)}
+           FROM t_p74494482_auto_seo_news_site.news_related r
+           JOIN t_p74494482_auto_seo_news_site.news ON news.id = r.related_id
+           WHERE r.news_id = %s
+           ORDER BY r.score DESC, published_at DESC
+           LIMIT %s""",
+        (news_item['id'], limit)
+    )
+    related = cursor.fetchall()
+    
+    if len(related) < limit:
+        cursor.execute(
+            f"""SELECT {select_columns(CARD_FIELDS)}
+               FROM t_p74494482_auto_seo_news_site.news
+               WHERE category = %s AND id <> ALL(%s)
+               ORDER BY published_at DESC, id DESC
+               LIMIT %s""",
+            (news_item['category'], [news_item['id']] + [item['id'] for item in related], limit - len(related))
+        )
+        related += cursor.fetchall()
+    
+    return [format_news(item, CARD_FIELDS) for item in related]
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def build_etag(total: int, last_modified: Optional[datetime], variant: str) -> str:
+    raw = f"{total}|{last_modified.isoformat() if last_modified else ''}|{variant}"
+    return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def is_not_modified(event: Dict[str, Any], etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag.removeprefix('W/') in tags
+    if_modified_since = get_header(event, 'If-Modified-Since')
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+def not_modified_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag, Last-Modified',
+        'Cache-Control': 'no-cache',
+        **validator_headers(etag, last_modified)
+    }
+
+def list_headers(etag: str, last_modified: Optional[datetime], extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    extra = extra or {}
+    return {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': ', '.join(['ETag', 'Last-Modified', *extra]),
+        'Cache-Control': 'no-cache',
+        **extra,
+        **validator_headers(etag, last_modified)
+    }
+
+def load_news_validator(cursor, conditions: List[str], query_params: List[Any]) -> Dict[str, Any]:
+    validator_where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    cursor.execute(
+        f"""SELECT COUNT(*) AS total, MAX(updated_at) AS last_modified
+           FROM t_p74494482_auto_seo_news_site.news
+           {validator_where}""",
+        query_params
+    )
+    return cursor.fetchone()
+
+def cache_get(key: str, etag: str) -> Optional[str]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[1] == etag and time.monotonic() - entry[0] < CACHE_TTL_SECONDS:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return entry[2]
+        if entry:
+            del _cache[key]
+        _cache_stats['misses'] += 1
+        return None
+
+def cache_put(key: str, etag: str, body: str) -> None:
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), etag, body)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+def cache_headers(cache_status: str) -> Dict[str, str]:
+    return {
+        'X-Cache': cache_status,
+        'X-Cache-Stats': f"hits={_cache_stats['hits']}; misses={_cache_stats['misses']}; size={len(_cache)}"
+    }
+
+def fetch_news_by_slug(cursor, slug: str) -> Optional[Dict[str, Any]]:
+    cursor.execute(
+        f"""SELECT {select_columns(FULL_FIELDS)}
+           FROM t_p74494482_auto_seo_news_site.news
+           WHERE slug = %s""",
+        (slug,)
+    )
+    return cursor.fetchone()
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -23,7 +270,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
@@ -60,25 +307,62 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         params = event.get('queryStringParameters') or {}
         news_id = params.get('id')
+        slug = params.get('slug')
         category = params.get('category')
         limit = int(params.get('limit', 50))
         offset = int(params.get('offset', 0))
+        cursor_param = params.get('cursor')
+        since_param = params.get('since')
+        search_query = (params.get('q') or '').strip()
+        trending = params.get('sort') == 'trending'
+        facets = params.get('facets') == '1'
+        
+        seek: Optional[Tuple[Any, int]] = None
+        if cursor_param:
+            try:
+                seek = decode_search_cursor(cursor_param) if search_query or trending else decode_cursor(cursor_param)
+            except (ValueError, TypeError):
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'error': 'Invalid cursor'}),
+                    'isBase64Encoded': False
+                }
+        
+        since: Optional[Tuple[str, Any]] = None
+        if since_param:
+            try:
+                since = parse_since(since_param)
+            except ValueError:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'error': 'Invalid since'}),
+                    'isBase64Encoded': False
+                }
         
-        conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
+        conn = get_db_connection()
         cursor = conn.cursor()
         
-        if news_id:
-            query = f"""SELECT id, title, excerpt, content, category, image_url, 
-                   author, published_at, is_hot, views_count, slug,
-                   meta_title, meta_description 
-                   FROM t_p74494482_auto_seo_news_site.news 
-                   WHERE id = {int(news_id)}"""
-            cursor.execute(query)
-            news_item = cursor.fetchone()
+        if news_id or slug:
+            if news_id:
+                query = f"""SELECT {select_columns(FULL_FIELDS)}
+                       FROM t_p74494482_auto_seo_news_site.news
+                       WHERE id = {int(news_id)}"""
+                cursor.execute(query)
+                news_item = cursor.fetchone()
+            else:
+                news_item = fetch_news_by_slug(cursor, slug)
             
             if not news_item:
                 cursor.close()
-                conn.close()
+                release_db_connection(conn)
                 return {
                     'statusCode': 404,
                     'headers': {
@@ -89,8 +373,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
+            response_body = {'news': format_news(news_item, FULL_FIELDS)}
+            if 'related' in (params.get('include') or '').split(','):
+                response_body['related'] = load_related(cursor, news_item, RELATED_LIMIT)
+            
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 200,
@@ -98,75 +386,294 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({
-                    'news': {
-                        'id': news_item['id'],
-                        'title': news_item['title'],
-                        'excerpt': news_item['excerpt'],
-                        'content': news_item['content'],
-                        'category': news_item['category'],
-                        'image': news_item['image_url'],
-                        'author': news_item['author'],
-                        'time': news_item['published_at'].isoformat() if news_item['published_at'] else None,
-                        'isHot': news_item['is_hot'],
-                        'views': news_item['views_count'],
-                        'slug': news_item['slug'],
-                        'metaTitle': news_item['meta_title'],
-                        'metaDescription': news_item['meta_description']
-                    }
-                }),
+                'body': json.dumps(response_body),
                 'isBase64Encoded': False
             }
         
+        conditions = []
+        query_params: list = []
+        
         if category and category != 'Главная':
-            escaped_category = escape_string(category)
-            query = f"""SELECT id, title, excerpt, content, category, image_url, 
-                   author, published_at, is_hot, views_count, slug,
-                   meta_title, meta_description 
-                   FROM t_p74494482_auto_seo_news_site.news 
-                   WHERE category = '{escaped_category}' 
-                   ORDER BY published_at DESC 
-                   LIMIT {limit} OFFSET {offset}"""
+            conditions.append('category = %s')
+            query_params.append(category)
+        
+        validator_where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        if facets:
+            cursor.execute(
+                f"""SELECT COALESCE(SUM(total), 0)::bigint AS total, MAX(updated_at) AS last_modified
+                   FROM t_p74494482_auto_seo_news_site.news_category_stats
+                   {validator_where}""",
+                query_params
+            )
+            validator = cursor.fetchone()
+        elif trending:
+            cursor.execute(
+                f"""SELECT COUNT(*) AS total, MAX(refreshed_at) AS last_modified
+                   FROM t_p74494482_auto_seo_news_site.news_trending
+                   {validator_where}""",
+                query_params
+            )
+            validator = cursor.fetchone()
         else:
-            query = f"""SELECT id, title, excerpt, content, category, image_url, 
-                   author, published_at, is_hot, views_count, slug,
-                   meta_title, meta_description 
-                   FROM t_p74494482_auto_seo_news_site.news 
-                   ORDER BY published_at DESC 
-                   LIMIT {limit} OFFSET {offset}"""
-        
-        cursor.execute(query)
-        news = cursor.fetchall()
-        news_list = []
-        
-        for item in news:
-            news_list.append({
-                'id': item['id'],
-                'title': item['title'],
-                'excerpt': item['excerpt'],
-                'content': item['content'],
-                'category': item['category'],
-                'image': item['image_url'],
-                'author': item['author'],
-                'time': item['published_at'].isoformat() if item['published_at'] else None,
-                'isHot': item['is_hot'],
-                'views': item['views_count'],
-                'slug': item['slug'],
-                'metaTitle': item['meta_title'],
-                'metaDescription': item['meta_description']
+            validator = load_news_validator(cursor, conditions, query_params)
+        last_modified = validator['last_modified']
+        cache_key = json.dumps(params, sort_keys=True)
+        etag = build_etag(validator['total'], last_modified, cache_key)
+        
+        if is_not_modified(event, etag, last_modified):
+            cursor.close()
+            release_db_connection(conn)
+            return {
+                'statusCode': 304,
+                'headers': not_modified_headers(etag, last_modified),
+                'body': '',
+                'isBase64Encoded': False
+            }
+        
+        cached_body = cache_get(cache_key, etag)
+        if cached_body is not None:
+            cursor.close()
+            release_db_connection(conn)
+            return {
+                'statusCode': 200,
+                'headers': list_headers(etag, last_modified, cache_headers('HIT')),
+                'body': cached_body,
+                'isBase64Encoded': False
+            }
+        
+        fields = resolve_fields(params)
+        
+        if facets:
+            facet_where = ' AND '.join(conditions + ['total > 0'])
+            cursor.execute(
+                f"""SELECT category, total, newest_published_at
+                   FROM t_p74494482_auto_seo_news_site.news_category_stats
+                   WHERE {facet_where}
+                   ORDER BY total DESC, category""",
+                query_params
+            )
+            stats = cursor.fetchall()
+            newest = max((item['newest_published_at'] for item in stats if item['newest_published_at']), default=None)
+            
+            body = json.dumps({
+                'facets': [
+                    {
+                        'category': item['category'],
+                        'count': item['total'],
+                        'newest': item['newest_published_at'].isoformat() if item['newest_published_at'] else None
+                    }
+                    for item in stats
+                ],
+                'total': validator['total'],
+                'newest': newest.isoformat() if newest else None
+            })
+            cache_put(cache_key, etag, body)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': list_headers(etag, last_modified, cache_headers('MISS')),
+                'body': body,
+                'isBase64Encoded': False
+            }
+        
+        if trending:
+            trending_conditions = list(conditions)
+            pagination_clause = 'LIMIT %s'
+            if seek:
+                trending_conditions.append('(score, news_id) < (%s, %s)')
+                query_params.extend(seek)
+                query_params.append(limit)
+            else:
+                pagination_clause += ' OFFSET %s'
+                query_params.extend([limit, offset])
+            trending_where = f"WHERE {' AND '.join(trending_conditions)}" if trending_conditions else ''
+            
+            cursor.execute(
+                f"""SELECT {select_columns(fields)}, page.score, page.trending_rank
+                   FROM (
+                       SELECT news_id, score, trending_rank
+                       FROM t_p74494482_auto_seo_news_site.news_trending
+                       {trending_where}
+                       ORDER BY score DESC, news_id DESC
+                       {pagination_clause}
+                   ) page
+                   JOIN t_p74494482_auto_seo_news_site.news ON news.id = page.news_id
+                   ORDER BY page.score DESC, page.news_id DESC""",
+                query_params
+            )
+            news = cursor.fetchall()
+            news_list = [{**format_news(item, fields), 'rank': item['trending_rank']} for item in news]
+            
+            next_cursor = None
+            if news and len(news) == limit:
+                next_cursor = encode_search_cursor(news[-1]['score'], news[-1]['id'])
+            
+            body = json.dumps({
+                'news': news_list,
+                'count': len(news_list),
+                'next_cursor': next_cursor,
+                'sort': 'trending'
             })
+            cache_put(cache_key, etag, body)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': list_headers(etag, last_modified, cache_headers('MISS')),
+                'body': body,
+                'isBase64Encoded': False
+            }
+        
+        if search_query:
+            search_conditions = ['search_vector @@ search_query'] + conditions
+            seek_clause = ''
+            if seek:
+                seek_clause = 'WHERE (rank, id) < (%s::real, %s)'
+                query_params.extend(seek)
+            
+            cursor.execute(
+                f"""SELECT page.*, ts_headline('russian', concat_ws(' ', source.excerpt, source.content),
+                          websearch_to_tsquery('russian', %s),
+                          'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2') AS snippet
+                   FROM (
+                       SELECT * FROM (
+                           SELECT {select_columns(fields)}, ts_rank(search_vector, search_query) AS rank
+                           FROM t_p74494482_auto_seo_news_site.news,
+                                websearch_to_tsquery('russian', %s) AS search_query
+                           WHERE {' AND '.join(search_conditions)}
+                       ) ranked
+                       {seek_clause}
+                       ORDER BY rank DESC, id DESC
+                       LIMIT %s
+                   ) page
+                   JOIN t_p74494482_auto_seo_news_site.news source ON source.id = page.id
+                   ORDER BY page.rank DESC, page.id DESC""",
+                [search_query, search_query] + query_params + [limit]
+            )
+            news = cursor.fetchall()
+            news_list = [{**format_news(item, fields), 'snippet': item['snippet']} for item in news]
+            
+            next_cursor = None
+            if news and len(news) == limit:
+                next_cursor = encode_search_cursor(news[-1]['rank'], news[-1]['id'])
+            
+            body = json.dumps({
+                'news': news_list,
+                'count': len(news_list),
+                'next_cursor': next_cursor,
+                'query': search_query
+            })
+            cache_put(cache_key, etag, body)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': list_headers(etag, last_modified, cache_headers('MISS')),
+                'body': body,
+                'isBase64Encoded': False
+            }
+        
+        if since:
+            since_kind, since_value = since
+            if since_kind == 'id':
+                cursor.execute(
+                    '''SELECT published_at, id FROM t_p74494482_auto_seo_news_site.news
+                       WHERE id = %s AND published_at IS NOT NULL''',
+                    (since_value,)
+                )
+                anchor = cursor.fetchone()
+                if not anchor:
+                    cursor.close()
+                    release_db_connection(conn)
+                    return {
+                        'statusCode': 400,
+                        'headers': {
+                            'Content-Type': 'application/json',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': json.dumps({'error': 'Unknown since id, resync required'}),
+                        'isBase64Encoded': False
+                    }
+                since_value = (anchor['published_at'], anchor['id'])
+            conditions.append('(published_at, id) > (%s, %s)')
+            query_params.extend([*since_value, limit])
+            
+            cursor.execute(
+                f"""SELECT {select_columns(fields)}
+                   FROM t_p74494482_auto_seo_news_site.news
+                   WHERE {' AND '.join(conditions)}
+                   ORDER BY published_at ASC, id ASC
+                   LIMIT %s""",
+                query_params
+            )
+            news = list(reversed(cursor.fetchall()))
+            news_list = [format_news(item, fields) for item in news]
+            
+            watermark = since_param
+            if news and news[0]['published_at']:
+                watermark = encode_cursor(news[0]['published_at'], news[0]['id'])
+            
+            body = json.dumps({
+                'news': news_list,
+                'count': len(news_list),
+                'watermark': watermark,
+                'has_more': len(news_list) == limit
+            })
+            cache_put(cache_key, etag, body)
+            
+            cursor.close()
+            release_db_connection(conn)
+            
+            return {
+                'statusCode': 200,
+                'headers': list_headers(etag, last_modified, cache_headers('MISS')),
+                'body': body,
+                'isBase64Encoded': False
+            }
+        
+        if seek:
+            conditions.append('(published_at, id) < (%s, %s)')
+            query_params.extend(seek)
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        pagination_clause = 'LIMIT %s'
+        query_params.append(limit)
+        if not seek:
+            pagination_clause += ' OFFSET %s'
+            query_params.append(offset)
+        
+        query = f"""SELECT {select_columns(fields)}
+               FROM t_p74494482_auto_seo_news_site.news
+               {where_clause}
+               ORDER BY published_at DESC, id DESC
+               {pagination_clause}"""
+        
+        cursor.execute(query, query_params)
+        news = cursor.fetchall()
+        news_list = [format_news(item, fields) for item in news]
+        
+        next_cursor = None
+        if news and len(news) == limit and news[-1]['published_at']:
+            next_cursor = encode_cursor(news[-1]['published_at'], news[-1]['id'])
+        
+        body = json.dumps({'news': news_list, 'count': len(news_list), 'next_cursor': next_cursor})
+        cache_put(cache_key, etag, body)
         
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
         
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Cache-Control': 'no-cache'
-            },
-            'body': json.dumps({'news': news_list, 'count': len(news_list)}),
+            'headers': list_headers(etag, last_modified, cache_headers('MISS')),
+            'body': body,
             'isBase64Encoded': False
         }
         
@@ -177,10 +684,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             except:
                 pass
         if conn:
-            try:
-                conn.close()
-            except:
-                pass
+            release_db_connection(conn)
         
         return {
             'statusCode': 500,
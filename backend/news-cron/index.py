@@ -1,16 +1,175 @@
 '''
-Business: Планировщик автогенерации новостей каждые 30 секунд
-Args: event - dict с httpMethod (любой вызов запускает генерацию)
+Business: Планировщик автогенерации новостей - ставит задание в очередь generation_jobs, будит воркер
+          и раз в 5 минут обновляет витрину news_trending
+Args: event - dict с httpMethod (любой вызов ставит задание, повторные ожидающие задания не дублируются),
+             queryStringParameters (category - одна из ALL_CATEGORIES)
       context - object с request_id
-Returns: HTTP response со статусом запуска генератора
+Returns: HTTP response со статусом постановки задания
 '''
 
 import json
 import os
+import random
+import time
+import psycopg2
+import psycopg2.extensions
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 AUTO_NEWS_URL = 'https://functions.poehali.dev/110a45c8-d0f9-42fd-93e3-ffc41cad489b'
+JOB_DEDUP_KEY = 'single'
+ALL_CATEGORIES = ['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта']
+WORKER_WAKE_AFTER_SECONDS = 60
+WAKE_TIMEOUT = (3.05, 0.5)
+
+TRENDING_REFRESH_INTERVAL_SECONDS = 300
+TRENDING_REFRESH_LOCK_KEY = 74494483
+
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 4
+RUN_DEADLINE_SECONDS = 10
+
+_db_connection = None
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+_http_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+_run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+def start_run_deadline() -> None:
+    global _run_deadline
+    _run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+def retry_after_seconds(response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_seconds(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def http_get(url: str, timeout, **kwargs):
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        if time.monotonic() >= _run_deadline:
+            raise requests.Timeout('Run deadline exceeded before the request could be sent')
+        
+        try:
+            response = _http_session.get(url, timeout=timeout, **kwargs)
+        except requests.ConnectionError:
+            delay = backoff_seconds(attempt)
+            if attempt == HTTP_MAX_RETRIES or time.monotonic() + delay >= _run_deadline:
+                raise
+            time.sleep(delay)
+            continue
+        
+        if response.status_code not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+            return response
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = backoff_seconds(attempt)
+        if time.monotonic() + delay >= _run_deadline:
+            return response
+        response.close()
+        time.sleep(delay)
+
+def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    database_url = os.environ.get('DATABASE_URL')
+    _db_connection = psycopg2.connect(database_url)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
+
+def enqueue_job(cursor, conn, category: Optional[str]) -> Dict[str, Any]:
+    cursor.execute("""
+        INSERT INTO t_p74494482_auto_seo_news_site.generation_jobs (dedup_key, category)
+        VALUES (%s, %s)
+        ON CONFLICT (dedup_key) WHERE status = 'pending' DO NOTHING
+        RETURNING id
+    """, (JOB_DEDUP_KEY if category is None else f'{JOB_DEDUP_KEY}:{category}', category))
+    inserted = cursor.fetchone()
+    
+    cursor.execute("""
+        SELECT COUNT(*), EXTRACT(EPOCH FROM NOW() - MIN(created_at) FILTER (WHERE available_at <= NOW()))
+        FROM t_p74494482_auto_seo_news_site.generation_jobs
+        WHERE status = 'pending'
+    """)
+    pending, oldest_age = cursor.fetchone()
+    conn.commit()
+    
+    return {
+        'job_id': inserted[0] if inserted else None,
+        'pending': pending,
+        'wake_worker': inserted is not None or (oldest_age or 0) > WORKER_WAKE_AFTER_SECONDS
+    }
+
+def refresh_trending(cursor, conn) -> bool:
+    cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (TRENDING_REFRESH_LOCK_KEY,))
+    if not cursor.fetchone()[0]:
+        conn.rollback()
+        return False
+    
+    cursor.execute("""
+        SELECT EXTRACT(EPOCH FROM NOW() - MAX(refreshed_at))
+        FROM t_p74494482_auto_seo_news_site.news_trending
+    """)
+    age = cursor.fetchone()[0]
+    if age is not None and age < TRENDING_REFRESH_INTERVAL_SECONDS:
+        conn.rollback()
+        return False
+    
+    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY t_p74494482_auto_seo_news_site.news_trending")
+    conn.commit()
+    return True
+
+def wake_worker() -> None:
+    try:
+        http_get(AUTO_NEWS_URL, WAKE_TIMEOUT, params={'action': 'worker'})
+    except requests.exceptions.ReadTimeout:
+        pass
+    except Exception as e:
+        print(f'Не удалось разбудить воркер: {type(e).__name__}: {e}')
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -28,38 +187,59 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
+    start_run_deadline()
     try:
-        response = requests.get(AUTO_NEWS_URL, timeout=30)
-        
-        if response.status_code == 200:
-            data = response.json()
+        if not os.environ.get('DATABASE_URL'):
             return {
-                'statusCode': 200,
+                'statusCode': 500,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({
-                    'success': True,
-                    'message': 'Генератор новостей запущен',
-                    'generator_response': data
-                }),
+                'body': json.dumps({'success': False, 'error': 'Database not configured'}),
                 'isBase64Encoded': False
             }
-        else:
+        
+        params = event.get('queryStringParameters') or {}
+        category = params.get('category') or None
+        if category is not None and category not in ALL_CATEGORIES:
             return {
-                'statusCode': 200,
+                'statusCode': 400,
                 'headers': {
                     'Content-Type': 'application/json',
                     'Access-Control-Allow-Origin': '*'
                 },
-                'body': json.dumps({
-                    'success': False,
-                    'message': f'Генератор вернул статус {response.status_code}',
-                    'error': response.text
-                }),
+                'body': json.dumps({'success': False, 'error': 'Unknown category'}),
                 'isBase64Encoded': False
             }
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        job = enqueue_job(cursor, conn, category)
+        
+        if job['wake_worker']:
+            wake_worker()
+        
+        trending_refreshed = refresh_trending(cursor, conn)
+        cursor.close()
+        release_db_connection(conn)
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'success': True,
+                'enqueued': job['job_id'] is not None,
+                'job_id': job['job_id'],
+                'pending': job['pending'],
+                'trending_refreshed': trending_refreshed,
+                'message': 'Задание на генерацию поставлено в очередь' if job['job_id'] else 'Задание уже ожидает в очереди'
+            }),
+            'isBase64Encoded': False
+        }
     
     except Exception as e:
         return {
@@ -0,0 +1,288 @@
+'''
+Business: Push-канал новых новостей (long-poll / SSE) поверх Postgres LISTEN/NOTIFY
+Args: event - dict с httpMethod, headers (Accept, Last-Event-ID), queryStringParameters (since - watermark get-news или ISO-время, category, timeout, transport)
+      context - object с request_id
+Returns: HTTP response с новостями, опубликованными после since, и новым watermark
+'''
+
+import base64
+import json
+import math
+import os
+import select
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import psycopg2
+import psycopg2.extensions
+
+NOTIFY_CHANNEL = 'news_inserted'
+BUFFER_SIZE = 200
+MAX_WAIT_SECONDS = 25
+LISTEN_POLL_SECONDS = 5
+RECONNECT_DELAY_SECONDS = 2
+
+_condition = threading.Condition()
+_buffer: deque = deque()
+_baseline: Optional[Tuple[datetime, int]] = None
+_evicted_until: Optional[Tuple[datetime, int]] = None
+_listener_ready = False
+_listener_thread: Optional[threading.Thread] = None
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def encode_cursor(published_at: datetime, news_id: int) -> str:
+    raw = json.dumps([published_at.isoformat(), news_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor_value: str) -> Tuple[datetime, int]:
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    published_at, news_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    return datetime.fromisoformat(published_at), int(news_id)
+
+def parse_since(since_value: str) -> Tuple[datetime, int]:
+    try:
+        return decode_cursor(since_value)
+    except (ValueError, TypeError):
+        pass
+    return parse_timestamp(since_value), 0
+
+def remember_news(payload: str) -> None:
+    global _evicted_until
+    try:
+        item = json.loads(payload)
+        position = (parse_timestamp(item['time']), int(item['id']))
+    except (ValueError, KeyError, TypeError):
+        return
+    with _condition:
+        _buffer.append((position, item))
+        while len(_buffer) > BUFFER_SIZE:
+            evicted, _ = _buffer.popleft()
+            if _evicted_until is None or evicted > _evicted_until:
+                _evicted_until = evicted
+        _condition.notify_all()
+
+def listen_forever(db_url: str) -> None:
+    global _baseline, _listener_ready
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(db_url)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            cur = conn.cursor()
+            cur.execute(f'LISTEN {NOTIFY_CHANNEL}')
+            cur.execute('''SELECT published_at, id FROM t_p74494482_auto_seo_news_site.news
+                           WHERE published_at IS NOT NULL
+                           ORDER BY published_at DESC, id DESC
+                           LIMIT 1''')
+            row = cur.fetchone()
+            baseline = (row[0], row[1]) if row else None
+            with _condition:
+                if _baseline is None or (baseline and baseline > _baseline):
+                    _baseline = baseline
+                _listener_ready = True
+                _condition.notify_all()
+            
+            while True:
+                if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    remember_news(conn.notifies.pop(0).payload)
+        except Exception:
+            with _condition:
+                _listener_ready = False
+            time.sleep(RECONNECT_DELAY_SECONDS)
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+def ensure_listener(db_url: str) -> None:
+    global _listener_thread
+    with _condition:
+        if _listener_thread and _listener_thread.is_alive():
+            return
+        _listener_thread = threading.Thread(target=listen_forever, args=(db_url,), daemon=True)
+        _listener_thread.start()
+
+def needs_resync(since: Tuple[datetime, int]) -> bool:
+    if _baseline is not None and since < _baseline:
+        return True
+    return _evicted_until is not None and since < _evicted_until
+
+def collect_news(since: Tuple[datetime, int], category: Optional[str]) -> List[Tuple[Tuple[datetime, int], Dict[str, Any]]]:
+    return [
+        (position, item) for position, item in reversed(_buffer)
+        if position > since and (not category or item.get('category') == category)
+    ]
+
+def wait_for_news(since: Tuple[datetime, int], category: Optional[str], timeout: float) -> Dict[str, Any]:
+    deadline = time.monotonic() + timeout
+    with _condition:
+        while True:
+            if _listener_ready and needs_resync(since):
+                return {'found': [], 'resync': True}
+            found = collect_news(since, category) if _listener_ready else []
+            remaining = deadline - time.monotonic()
+            if found or remaining <= 0:
+                return {'found': found, 'resync': False}
+            _condition.wait(remaining)
+
+def format_sse(found: List[Tuple[Tuple[datetime, int], Dict[str, Any]]], watermark: str, resync: bool) -> str:
+    lines = ['retry: 1000', '']
+    if resync:
+        lines += [f'id: {watermark}', 'event: resync', 'data: {}', '']
+    for position, item in reversed(found):
+        lines += [f'id: {encode_cursor(*position)}', 'event: news', f'data: {json.dumps(item)}', '']
+    if not found and not resync:
+        lines += [f'id: {watermark}', ': keepalive', '']
+    return '\n'.join(lines) + '\n'
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, Last-Event-ID',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': '',
+            'isBase64Encoded': False
+        }
+    
+    if method != 'GET':
+        return {
+            'statusCode': 405,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'Method not allowed'}),
+            'isBase64Encoded': False
+        }
+    
+    try:
+        db_url = os.environ.get('DATABASE_URL')
+        
+        if not db_url:
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Database not configured'}),
+                'isBase64Encoded': False
+            }
+        
+        params = event.get('queryStringParameters') or {}
+        since_param = get_header(event, 'Last-Event-ID') or params.get('since')
+        category = params.get('category')
+        if category == 'Главная':
+            category = None
+        use_sse = params.get('transport') == 'sse' or 'text/event-stream' in (get_header(event, 'Accept') or '')
+        
+        if not since_param:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'since is required'}),
+                'isBase64Encoded': False
+            }
+        
+        try:
+            since = parse_since(since_param)
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Invalid since'}),
+                'isBase64Encoded': False
+            }
+        
+        try:
+            timeout = float(params.get('timeout', MAX_WAIT_SECONDS))
+            if not math.isfinite(timeout):
+                raise ValueError(timeout)
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Invalid timeout'}),
+                'isBase64Encoded': False
+            }
+        timeout = min(max(timeout, 0.0), MAX_WAIT_SECONDS)
+        
+        ensure_listener(db_url)
+        result = wait_for_news(since, category, timeout)
+        found = result['found']
+        news_list = [item for _, item in found]
+        watermark = encode_cursor(*(found[0][0] if found else since))
+        
+        if use_sse:
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'text/event-stream; charset=utf-8',
+                    'Access-Control-Allow-Origin': '*',
+                    'Cache-Control': 'no-cache'
+                },
+                'body': format_sse(found, watermark, result['resync']),
+                'isBase64Encoded': False
+            }
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'no-cache'
+            },
+            'body': json.dumps({
+                'news': news_list,
+                'count': len(news_list),
+                'watermark': watermark,
+                'resync': result['resync']
+            }),
+            'isBase64Encoded': False
+        }
+        
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e), 'type': type(e).__name__}),
+            'isBase64Encoded': False
+        }
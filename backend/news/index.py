@@ -1,5 +1,5 @@
 '''
-Business: API для управления новостями - получение списка, добавление, обновление и удаление
+Business: API для управления новостями - получение списка, добавление, обновление, удаление и учёт просмотров (POST ?action=view&id=)
 Args: event - dict с httpMethod, body, queryStringParameters, pathParams
       context - object с атрибутами request_id, function_name
 Returns: HTTP response dict с новостями или статусом операции
@@ -7,14 +7,83 @@ Returns: HTTP response dict с новостями или статусом опе
 
 import json
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import base64
+import hashlib
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor, execute_values
+
+FIELD_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'content': 'content',
+    'category': 'category',
+    'image': 'image_url',
+    'author': 'author',
+    'time': 'published_at',
+    'isHot': 'is_hot',
+    'views': 'views_count',
+    'slug': 'slug',
+    'metaTitle': 'meta_title',
+    'metaDescription': 'meta_description'
+}
+
+FULL_FIELDS = list(FIELD_COLUMNS.keys())
+CARD_FIELDS = [field for field in FULL_FIELDS if field != 'content']
+
+VIEW_FLUSH_INTERVAL_SECONDS = 10
+VIEW_FLUSH_MAX_PENDING = 500
+VIEW_FLUSH_MAX_ATTEMPTS = 3
+MAX_NEWS_ID = 2 ** 31 - 1
+
+_db_connection = None
+_pending_views: Dict[int, int] = {}
+_views_lock = threading.Lock()
+_views_flushed_at = time.monotonic()
+_views_connection = None
+_views_flush_lock = threading.Lock()
+_views_timer: Optional[threading.Timer] = None
+_views_failed_attempts: Dict[int, int] = {}
 
 def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
     database_url = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    _db_connection = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
 
 def create_slug(title: str) -> str:
     slug = title.lower()
@@ -22,6 +91,220 @@ def create_slug(title: str) -> str:
     slug = '-'.join(slug.split())
     return slug[:100]
 
+def insert_news_with_unique_slug(cursor, columns: Dict[str, Any], base_slug: str, max_attempts: int = 5):
+    column_names = list(columns.keys())
+    query = f'''
+        WITH next_slug AS (
+            SELECT CASE
+                WHEN NOT COALESCE(bool_or(slug = %(base_slug)s), FALSE) THEN %(base_slug)s
+                ELSE %(base_slug)s || '-' || (COALESCE(MAX(
+                    CASE WHEN substring(slug FROM char_length(%(base_slug)s) + 2) ~ '^[0-9]{{1,9}}$'
+                         THEN substring(slug FROM char_length(%(base_slug)s) + 2)::int
+                    END
+                ), 0) + 1)
+            END AS slug
+            FROM t_p74494482_auto_seo_news_site.news
+            WHERE slug = %(base_slug)s OR slug LIKE %(base_slug)s || '-%%'
+        )
+        INSERT INTO t_p74494482_auto_seo_news_site.news ({', '.join(column_names)}, slug)
+        SELECT {', '.join(f'%({name})s' for name in column_names)}, next_slug.slug
+        FROM next_slug
+        ON CONFLICT (slug) DO NOTHING
+        RETURNING id, slug
+    '''
+    
+    for attempt in range(max_attempts):
+        cursor.execute(query, {**columns, 'base_slug': base_slug})
+        result = cursor.fetchone()
+        if result is not None:
+            return result
+    
+    raise RuntimeError(f'Could not allocate a unique slug for "{base_slug}"')
+
+def encode_cursor(published_at: datetime, news_id: int) -> str:
+    raw = json.dumps([published_at.isoformat(), news_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor_value: str) -> Tuple[datetime, int]:
+    padded = cursor_value + '=' * (-len(cursor_value) % 4)
+    published_at, news_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    return datetime.fromisoformat(published_at), int(news_id)
+
+def resolve_fields(params: Dict[str, Any]) -> List[str]:
+    fields_param = params.get('fields')
+    if fields_param:
+        requested = [field.strip() for field in fields_param.split(',')]
+        fields = [field for field in FULL_FIELDS if field in requested]
+        for required in ('time', 'id'):
+            if required not in fields:
+                fields.insert(0, required)
+        return fields
+    if params.get('view') == 'full':
+        return FULL_FIELDS
+    return CARD_FIELDS
+
+def select_columns(fields: List[str]) -> str:
+    return ', '.join(FIELD_COLUMNS[field] for field in fields)
+
+def format_news(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    news_item = {}
+    for field in fields:
+        value = item[FIELD_COLUMNS[field]]
+        if field == 'time':
+            value = value.isoformat() if value else None
+        news_item[field] = value
+    return news_item
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def build_etag(total: int, last_modified: Optional[datetime], variant: str) -> str:
+    raw = f"{total}|{last_modified.isoformat() if last_modified else ''}|{variant}"
+    return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def is_not_modified(event: Dict[str, Any], etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag.removeprefix('W/') in tags
+    if_modified_since = get_header(event, 'If-Modified-Since')
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+def not_modified_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag, Last-Modified',
+        'Cache-Control': 'no-cache',
+        **validator_headers(etag, last_modified)
+    }
+
+def list_headers(etag: str, last_modified: Optional[datetime], extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    extra = extra or {}
+    return {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': ', '.join(['ETag', 'Last-Modified', *extra]),
+        'Cache-Control': 'no-cache',
+        **extra,
+        **validator_headers(etag, last_modified)
+    }
+
+def load_news_validator(cursor, conditions: List[str], query_params: List[Any]) -> Dict[str, Any]:
+    validator_where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    cursor.execute(
+        f"""SELECT COUNT(*) AS total, MAX(updated_at) AS last_modified
+           FROM t_p74494482_auto_seo_news_site.news
+           {validator_where}""",
+        query_params
+    )
+    return cursor.fetchone()
+
+def schedule_views_flush() -> None:
+    global _views_timer
+    if _views_timer is None:
+        _views_timer = threading.Timer(VIEW_FLUSH_INTERVAL_SECONDS, flush_views_on_timer)
+        _views_timer.daemon = True
+        _views_timer.start()
+
+def record_view(news_id: int) -> int:
+    with _views_lock:
+        _pending_views[news_id] = _pending_views.get(news_id, 0) + 1
+        schedule_views_flush()
+        return sum(_pending_views.values())
+
+def take_due_views() -> Dict[int, int]:
+    global _pending_views, _views_flushed_at
+    with _views_lock:
+        due = time.monotonic() - _views_flushed_at >= VIEW_FLUSH_INTERVAL_SECONDS
+        if not _pending_views or not (due or sum(_pending_views.values()) >= VIEW_FLUSH_MAX_PENDING):
+            return {}
+        views, _pending_views = _pending_views, {}
+        _views_flushed_at = time.monotonic()
+        return views
+
+def flush_views(views: Dict[int, int]) -> bool:
+    global _views_connection
+    with _views_flush_lock:
+        try:
+            if _views_connection is None or _views_connection.closed:
+                _views_connection = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            cursor = _views_connection.cursor()
+            execute_values(
+                cursor,
+                '''
+                UPDATE t_p74494482_auto_seo_news_site.news AS n
+                SET views_count = COALESCE(n.views_count, 0) + v.delta
+                FROM (VALUES %s) AS v(id, delta)
+                WHERE n.id = v.id
+                ''',
+                sorted(views.items()),
+                template='(%s::int, %s::int)'
+            )
+            _views_connection.commit()
+            cursor.close()
+            with _views_lock:
+                for news_id in views:
+                    _views_failed_attempts.pop(news_id, None)
+            return True
+        except Exception as e:
+            print(f'Не удалось записать просмотры: {e}')
+            if _views_connection is not None:
+                try:
+                    _views_connection.close()
+                except psycopg2.Error:
+                    pass
+                _views_connection = None
+            with _views_lock:
+                for news_id, delta in views.items():
+                    attempts = _views_failed_attempts.get(news_id, 0) + 1
+                    if attempts >= VIEW_FLUSH_MAX_ATTEMPTS:
+                        _views_failed_attempts.pop(news_id, None)
+                        print(f'Просмотры новости {news_id} отброшены после {attempts} неудачных попыток')
+                        continue
+                    _views_failed_attempts[news_id] = attempts
+                    _pending_views[news_id] = _pending_views.get(news_id, 0) + delta
+            return False
+
+def flush_views_on_timer() -> None:
+    global _pending_views, _views_flushed_at, _views_timer
+    with _views_lock:
+        _views_timer = None
+        views, _pending_views = _pending_views, {}
+        _views_flushed_at = time.monotonic()
+    if views and not flush_views(views):
+        with _views_lock:
+            schedule_views_flush()
+
+def fetch_news_by_slug(cursor, slug: str) -> Optional[Dict[str, Any]]:
+    cursor.execute(
+        f"""SELECT {select_columns(FULL_FIELDS)}
+           FROM t_p74494482_auto_seo_news_site.news
+           WHERE slug = %s""",
+        (slug,)
+    )
+    return cursor.fetchone()
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
@@ -31,13 +314,49 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
+                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
+    params = event.get('queryStringParameters') or {}
+    if method == 'POST' and params.get('action') == 'view':
+        try:
+            news_id = int(params.get('id'))
+        except (TypeError, ValueError):
+            news_id = None
+        
+        if news_id is None or not 1 <= news_id <= MAX_NEWS_ID:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'News ID is required'}),
+                'isBase64Encoded': False
+            }
+        
+        pending = record_view(news_id)
+        views = take_due_views()
+        flushed = bool(views) and flush_views(views)
+        
+        return {
+            'statusCode': 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'success': True,
+                'pending': pending - sum(views.values()) if flushed else pending,
+                'flushed': len(views) if flushed else 0
+            }),
+            'isBase64Encoded': False
+        }
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -45,22 +364,26 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if method == 'GET':
             params = event.get('queryStringParameters') or {}
             news_id = params.get('id')
+            slug = params.get('slug')
             category = params.get('category')
             limit = int(params.get('limit', 50))
             offset = int(params.get('offset', 0))
             
-            if news_id:
-                cursor.execute(
-                    '''SELECT id, title, excerpt, content, category, image_url, 
-                       author, published_at, is_hot, views_count, slug,
-                       meta_title, meta_description 
-                       FROM t_p74494482_auto_seo_news_site.news 
-                       WHERE id = %s''',
-                    (news_id,)
-                )
-                news_item = cursor.fetchone()
+            if news_id or slug:
+                if news_id:
+                    cursor.execute(
+                        '''SELECT id, title, excerpt, content, category, image_url, 
+                           author, published_at, is_hot, views_count, slug,
+                           meta_title, meta_description 
+                           FROM t_p74494482_auto_seo_news_site.news 
+                           WHERE id = %s''',
+                        (news_id,)
+                    )
+                    news_item = cursor.fetchone()
+                else:
+                    news_item = fetch_news_by_slug(cursor, slug)
                 cursor.close()
-                conn.close()
+                release_db_connection(conn)
                 
                 if not news_item:
                     return {
@@ -99,57 +422,81 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
+            cursor_param = params.get('cursor')
+            seek = None
+            if cursor_param:
+                try:
+                    seek = decode_cursor(cursor_param)
+                except (ValueError, TypeError):
+                    cursor.close()
+                    release_db_connection(conn)
+                    return {
+                        'statusCode': 400,
+                        'headers': {
+                            'Content-Type': 'application/json',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': json.dumps({'error': 'Invalid cursor'}),
+                        'isBase64Encoded': False
+                    }
+            
+            conditions = []
+            query_params: List[Any] = []
+            
             if category and category != 'Главная':
-                cursor.execute(
-                    '''SELECT id, title, excerpt, content, category, image_url, 
-                       author, published_at, is_hot, views_count, slug,
-                       meta_title, meta_description 
-                       FROM t_p74494482_auto_seo_news_site.news 
-                       WHERE category = %s 
-                       ORDER BY published_at DESC 
-                       LIMIT %s OFFSET %s''',
-                    (category, limit, offset)
-                )
-            else:
-                cursor.execute(
-                    '''SELECT id, title, excerpt, content, category, image_url, 
-                       author, published_at, is_hot, views_count, slug,
-                       meta_title, meta_description 
-                       FROM t_p74494482_auto_seo_news_site.news 
-                       ORDER BY published_at DESC 
-                       LIMIT %s OFFSET %s''',
-                    (limit, offset)
-                )
+                conditions.append('category = %s')
+                query_params.append(category)
+            
+            validator = load_news_validator(cursor, conditions, query_params)
+            last_modified = validator['last_modified']
+            etag = build_etag(validator['total'], last_modified, json.dumps(params, sort_keys=True))
+            
+            if is_not_modified(event, etag, last_modified):
+                cursor.close()
+                release_db_connection(conn)
+                return {
+                    'statusCode': 304,
+                    'headers': not_modified_headers(etag, last_modified),
+                    'body': '',
+                    'isBase64Encoded': False
+                }
+            
+            if seek:
+                conditions.append('(published_at, id) < (%s, %s)')
+                query_params.extend(seek)
+            
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+            
+            pagination_clause = 'LIMIT %s'
+            query_params.append(limit)
+            if not seek:
+                pagination_clause += ' OFFSET %s'
+                query_params.append(offset)
+            
+            fields = resolve_fields(params)
+            cursor.execute(
+                f'''SELECT {select_columns(fields)}
+                   FROM t_p74494482_auto_seo_news_site.news 
+                   {where_clause}
+                   ORDER BY published_at DESC, id DESC 
+                   {pagination_clause}''',
+                query_params
+            )
             
             news = cursor.fetchall()
-            news_list = []
-            for item in news:
-                news_list.append({
-                    'id': item['id'],
-                    'title': item['title'],
-                    'excerpt': item['excerpt'],
-                    'content': item['content'],
-                    'category': item['category'],
-                    'image': item['image_url'],
-                    'author': item['author'],
-                    'time': item['published_at'].isoformat() if item['published_at'] else None,
-                    'isHot': item['is_hot'],
-                    'views': item['views_count'],
-                    'slug': item['slug'],
-                    'metaTitle': item['meta_title'],
-                    'metaDescription': item['meta_description']
-                })
+            news_list = [format_news(item, fields) for item in news]
+            
+            next_cursor = None
+            if news and len(news) == limit and news[-1]['published_at']:
+                next_cursor = encode_cursor(news[-1]['published_at'], news[-1]['id'])
             
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'news': news_list, 'count': len(news_list)}),
+                'headers': list_headers(etag, last_modified),
+                'body': json.dumps({'news': news_list, 'count': len(news_list), 'next_cursor': next_cursor}),
                 'isBase64Encoded': False
             }
         
@@ -178,34 +525,21 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
-            slug = create_slug(title)
-            slug_unique = slug
-            counter = 1
-            
-            while True:
-                cursor.execute(
-                    'SELECT id FROM t_p74494482_auto_seo_news_site.news WHERE slug = %s',
-                    (slug_unique,)
-                )
-                if cursor.fetchone() is None:
-                    break
-                slug_unique = f"{slug}-{counter}"
-                counter += 1
-            
-            cursor.execute(
-                '''INSERT INTO t_p74494482_auto_seo_news_site.news 
-                   (title, excerpt, content, category, image_url, author, is_hot, slug,
-                    meta_title, meta_description, meta_keywords)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                   RETURNING id, slug''',
-                (title, excerpt, content, category, image_url, author, is_hot, slug_unique,
-                 meta_title, meta_description, meta_keywords)
-            )
-            
-            result = cursor.fetchone()
+            result = insert_news_with_unique_slug(cursor, {
+                'title': title,
+                'excerpt': excerpt,
+                'content': content,
+                'category': category,
+                'image_url': image_url,
+                'author': author,
+                'is_hot': is_hot,
+                'meta_title': meta_title,
+                'meta_description': meta_description,
+                'meta_keywords': meta_keywords
+            }, create_slug(title))
             conn.commit()
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 201,
@@ -263,7 +597,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             conn.commit()
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 200,
@@ -297,7 +631,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             conn.commit()
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
             return {
                 'statusCode': 200,
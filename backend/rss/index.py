@@ -1,16 +1,145 @@
 import json
 import os
+import hashlib
 import psycopg2
-from typing import Dict, Any
-from datetime import datetime
+import psycopg2.extensions
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import html
+from collections import OrderedDict
+from urllib.parse import quote
+
+FEED_SIZE = 50
+RFC822_FORMAT = '%a, %d %b %Y %H:%M:%S +0000'
+SITE_URL = os.environ.get('SITE_URL', 'https://news24.ru').rstrip('/')
+FEED_CATEGORIES = ['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта']
+FEED_CACHE_MAX_ENTRIES = 16
+
+_db_connection = None
+_feed_cache: OrderedDict = OrderedDict()
+
+def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    database_url = os.environ.get('DATABASE_URL')
+    _db_connection = psycopg2.connect(database_url)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def build_etag(total: int, last_modified: Optional[datetime], variant: str) -> str:
+    raw = f"{total}|{last_modified.isoformat() if last_modified else ''}|{variant}"
+    return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def is_not_modified(event: Dict[str, Any], etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag.removeprefix('W/') in tags
+    if_modified_since = get_header(event, 'If-Modified-Since')
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+def render_feed(base_url: str, category: Optional[str], news_items: List[Tuple],
+                last_modified: Optional[datetime]) -> str:
+    if category:
+        channel_title = f'НОВОСТИ 24 - {category}'
+        channel_description = f'Актуальные новости категории {category}. Свежие материалы, аналитика и репортажи 24/7'
+        self_link = f'{base_url}/rss.xml?category={quote(category)}'
+    else:
+        channel_title = 'НОВОСТИ 24 - Актуальные новости России и мира'
+        channel_description = 'Последние новости дня: политика, экономика, технологии, спорт, культура. Оперативные новости России и мира 24/7'
+        self_link = f'{base_url}/rss.xml'
+    
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/">\n',
+        '  <channel>\n',
+        f'    <title>{html.escape(channel_title)}</title>\n',
+        f'    <link>{base_url}</link>\n',
+        f'    <description>{html.escape(channel_description)}</description>\n',
+        '    <language>ru</language>\n',
+        f'    <lastBuildDate>{(last_modified or datetime.now()).strftime(RFC822_FORMAT)}</lastBuildDate>\n',
+        f'    <atom:link href="{html.escape(self_link)}" rel="self" type="application/rss+xml"/>\n'
+    ]
+    
+    for news_id, title, excerpt, item_category, image_url, published_at, slug in news_items:
+        news_url = f'{base_url}/news/{slug}' if slug else f'{base_url}/news/{news_id}'
+        pub_date = (published_at or datetime.now()).strftime(RFC822_FORMAT)
+        
+        parts.append(
+            '    <item>\n'
+            f'      <title>{html.escape(title or "Новость")}</title>\n'
+            f'      <link>{news_url}</link>\n'
+            f'      <description>{html.escape(excerpt or "")}</description>\n'
+            f'      <category>{html.escape(item_category or "Общество")}</category>\n'
+            f'      <pubDate>{pub_date}</pubDate>\n'
+            f'      <guid isPermaLink="true">{news_url}</guid>\n'
+            '      <dc:creator>Редакция НОВОСТИ 24</dc:creator>\n'
+        )
+        if image_url:
+            parts.append(f'      <enclosure url="{html.escape(image_url)}" type="image/jpeg"/>\n')
+        parts.append('    </item>\n')
+    
+    parts.append('  </channel>\n')
+    parts.append('</rss>')
+    return ''.join(parts)
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Генерирует RSS-ленту для новостного агрегатора
-    Args: event - dict с httpMethod
+    Args: event - dict с httpMethod, queryStringParameters (category)
           context - object с request_id
-    Returns: RSS XML feed со всеми новостями
+    Returns: RSS XML feed с последними новостями (всеми или одной категории)
     '''
     method: str = event.get('httpMethod', 'GET')
     
@@ -20,7 +149,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': ''
@@ -42,66 +171,81 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'body': json.dumps({'error': 'DATABASE_URL not configured'})
             }
         
-        base_url = event.get('headers', {}).get('host', 'poehali.dev')
-        if not base_url.startswith('http'):
-            base_url = f'https://{base_url}'
+        base_url = SITE_URL
         
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
+        params = event.get('queryStringParameters') or {}
+        category = params.get('category')
+        if category == 'Главная':
+            category = None
+        
+        if category and category not in FEED_CATEGORIES:
+            return {
+                'statusCode': 404,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({'error': 'Unknown category'})
+            }
         
-        cur.execute("""
-            SELECT id, title, excerpt, content, category, image_url, published_at, slug
-            FROM news 
-            ORDER BY published_at DESC
-            LIMIT 50
-        """)
+        conn = get_db_connection()
+        cur = conn.cursor()
         
-        news_items = cur.fetchall()
-        cur.close()
-        conn.close()
+        if category:
+            cur.execute("SELECT COUNT(*), MAX(updated_at) FROM news WHERE category = %s", (category,))
+        else:
+            cur.execute("SELECT COUNT(*), MAX(updated_at) FROM news")
+        total, last_modified = cur.fetchone()
+        etag = build_etag(total, last_modified, f'{base_url}|{category or ""}')
         
-        rss_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        rss_content += '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
-        rss_content += '  <channel>\n'
-        rss_content += '    <title>НОВОСТИ 24 - Актуальные новости России и мира</title>\n'
-        rss_content += f'    <link>{base_url}</link>\n'
-        rss_content += '    <description>Последние новости дня: политика, экономика, технологии, спорт, культура. Оперативные новости России и мира 24/7</description>\n'
-        rss_content += '    <language>ru</language>\n'
-        rss_content += f'    <lastBuildDate>{datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000")}</lastBuildDate>\n'
-        rss_content += f'    <atom:link href="{base_url}/rss.xml" rel="self" type="application/rss+xml"/>\n'
+        if is_not_modified(event, etag, last_modified):
+            cur.close()
+            release_db_connection(conn)
+            return {
+                'statusCode': 304,
+                'headers': {
+                    'Access-Control-Allow-Origin': '*',
+                    'Cache-Control': 'public, max-age=1800',
+                    **validator_headers(etag, last_modified)
+                },
+                'isBase64Encoded': False,
+                'body': ''
+            }
         
-        for item in news_items:
-            news_id, title, excerpt, content, category, image_url, published_at, slug = item
-            
-            news_url = f'{base_url}/news/{news_id}'
-            if slug:
-                news_url = f'{base_url}/news/{slug}'
-            
-            pub_date = published_at.strftime('%a, %d %b %Y %H:%M:%S +0000') if published_at else datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-            
-            rss_content += '    <item>\n'
-            rss_content += f'      <title>{html.escape(title or "Новость")}</title>\n'
-            rss_content += f'      <link>{news_url}</link>\n'
-            rss_content += f'      <description>{html.escape(excerpt or "")}</description>\n'
-            rss_content += f'      <category>{html.escape(category or "Общество")}</category>\n'
-            rss_content += f'      <pubDate>{pub_date}</pubDate>\n'
-            rss_content += f'      <guid isPermaLink="true">{news_url}</guid>\n'
-            rss_content += f'      <dc:creator>Редакция НОВОСТИ 24</dc:creator>\n'
-            
-            if image_url:
-                rss_content += f'      <enclosure url="{html.escape(image_url)}" type="image/jpeg"/>\n'
-            
-            rss_content += '    </item>\n'
+        cache_key = category or ''
+        cached = _feed_cache.get(cache_key)
+        if cached and cached['etag'] == etag:
+            rss_content = cached['body']
+            _feed_cache.move_to_end(cache_key)
+        else:
+            if category:
+                cur.execute("""
+                    SELECT id, title, excerpt, category, image_url, published_at, slug
+                    FROM news 
+                    WHERE category = %s
+                    ORDER BY published_at DESC
+                    LIMIT %s
+                """, (category, FEED_SIZE))
+            else:
+                cur.execute("""
+                    SELECT id, title, excerpt, category, image_url, published_at, slug
+                    FROM news 
+                    ORDER BY published_at DESC
+                    LIMIT %s
+                """, (FEED_SIZE,))
+            rss_content = render_feed(base_url, category, cur.fetchall(), last_modified)
+            _feed_cache[cache_key] = {'etag': etag, 'body': rss_content}
+            _feed_cache.move_to_end(cache_key)
+            while len(_feed_cache) > FEED_CACHE_MAX_ENTRIES:
+                _feed_cache.popitem(last=False)
         
-        rss_content += '  </channel>\n'
-        rss_content += '</rss>'
+        cur.close()
+        release_db_connection(conn)
         
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/rss+xml; charset=utf-8',
                 'Access-Control-Allow-Origin': '*',
-                'Cache-Control': 'public, max-age=1800'
+                'Cache-Control': 'public, max-age=1800',
+                **validator_headers(etag, last_modified)
             },
             'isBase64Encoded': False,
             'body': rss_content
@@ -1,16 +1,231 @@
 import json
 import os
+import hashlib
 import psycopg2
-from typing import Dict, Any
-from datetime import datetime
+import psycopg2.extensions
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from collections import OrderedDict
+
+SHARD_SIZE = 10000
+SITE_URL = os.environ.get('SITE_URL', 'https://news24.ru').rstrip('/')
+SHARD_CACHE_MAX_ENTRIES = 64
+
+_db_connection = None
+_shard_cache: OrderedDict = OrderedDict()
+_index_cache: Optional[Dict[str, Any]] = None
+_shard_lastmods: Dict[int, Optional[datetime]] = {}
+
+def get_db_connection():
+    global _db_connection
+    conn = _db_connection
+    if conn is not None and not conn.closed:
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            health_cursor = conn.cursor()
+            health_cursor.execute('SELECT 1')
+            health_cursor.close()
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    database_url = os.environ.get('DATABASE_URL')
+    _db_connection = psycopg2.connect(database_url)
+    return _db_connection
+
+def release_db_connection(conn) -> None:
+    global _db_connection
+    try:
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except psycopg2.Error:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        if conn is _db_connection:
+            _db_connection = None
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+def build_etag(total: int, last_modified: Optional[datetime], variant: str) -> str:
+    raw = f"{total}|{last_modified.isoformat() if last_modified else ''}|{variant}"
+    return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def is_not_modified(event: Dict[str, Any], etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag.removeprefix('W/') in tags
+    if_modified_since = get_header(event, 'If-Modified-Since')
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+def shard_bounds(shard: int) -> Tuple[int, int]:
+    return shard * SHARD_SIZE + 1, (shard + 1) * SHARD_SIZE
+
+def format_lastmod(value: Optional[datetime]) -> str:
+    return (value or datetime.now()).strftime('%Y-%m-%d')
+
+def render_urlset(base_url: str, news_items: List[Tuple], include_home: bool) -> str:
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    ]
+    
+    if include_home:
+        parts.append(
+            '  <url>\n'
+            f'    <loc>{base_url}/</loc>\n'
+            f'    <lastmod>{format_lastmod(None)}</lastmod>\n'
+            '    <changefreq>hourly</changefreq>\n'
+            '    <priority>1.0</priority>\n'
+            '  </url>\n'
+        )
+    
+    for news_id, slug, published_at, updated_at in news_items:
+        news_url = f'{base_url}/news/{slug}' if slug else f'{base_url}/news/{news_id}'
+        parts.append(
+            '  <url>\n'
+            f'    <loc>{news_url}</loc>\n'
+            f'    <lastmod>{format_lastmod(updated_at or published_at)}</lastmod>\n'
+            '    <changefreq>daily</changefreq>\n'
+            '    <priority>0.8</priority>\n'
+            '  </url>\n'
+        )
+    
+    parts.append('</urlset>')
+    return ''.join(parts)
+
+def render_index(base_url: str, shards: List[Tuple[int, Optional[datetime]]]) -> str:
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        '  <sitemap>\n'
+        f'    <loc>{base_url}/sitemap.xml?shard=pages</loc>\n'
+        f'    <lastmod>{format_lastmod(None)}</lastmod>\n'
+        '  </sitemap>\n'
+    ]
+    
+    for shard, last_mod in shards:
+        parts.append(
+            '  <sitemap>\n'
+            f'    <loc>{base_url}/sitemap.xml?shard={shard}</loc>\n'
+            f'    <lastmod>{format_lastmod(last_mod)}</lastmod>\n'
+            '  </sitemap>\n'
+        )
+    
+    parts.append('</sitemapindex>')
+    return ''.join(parts)
+
+def shard_fingerprint(cur, shard: int) -> Tuple[int, Optional[datetime]]:
+    first_id, last_id = shard_bounds(shard)
+    cur.execute(
+        "SELECT COUNT(*), MAX(COALESCE(updated_at, published_at)) FROM news WHERE id BETWEEN %s AND %s",
+        (first_id, last_id)
+    )
+    total, last_modified = cur.fetchone()
+    return total, last_modified
+
+def load_shard(cur, base_url: str, shard: int) -> Dict[str, Any]:
+    first_id, last_id = shard_bounds(shard)
+    cur.execute("""
+        SELECT id, slug, published_at, updated_at 
+        FROM news 
+        WHERE id BETWEEN %s AND %s
+        ORDER BY id
+    """, (first_id, last_id))
+    news_items = cur.fetchall()
+    
+    last_modified = max((updated_at or published_at for _, _, published_at, updated_at in news_items
+                         if updated_at or published_at), default=None)
+    entry = {
+        'body': render_urlset(base_url, news_items, include_home=False),
+        'etag': build_etag(len(news_items), last_modified, f'{base_url}|{shard}'),
+        'last_modified': last_modified,
+        'fingerprint': (len(news_items), last_modified)
+    }
+    _shard_cache[shard] = entry
+    _shard_cache.move_to_end(shard)
+    while len(_shard_cache) > SHARD_CACHE_MAX_ENTRIES:
+        _shard_cache.popitem(last=False)
+    return entry
+
+def shard_lastmods(cur, max_id: int, changed_since: Optional[datetime]) -> List[Tuple[int, Optional[datetime]]]:
+    shard_count = (max_id - 1) // SHARD_SIZE + 1
+    if not _shard_lastmods or changed_since is None:
+        cur.execute("""
+            SELECT (id - 1) / %s AS shard, MAX(COALESCE(updated_at, published_at))
+            FROM news 
+            GROUP BY 1
+        """, (SHARD_SIZE,))
+        _shard_lastmods.clear()
+        _shard_lastmods.update(cur.fetchall())
+    else:
+        cur.execute(
+            "SELECT DISTINCT (id - 1) / %s FROM news WHERE updated_at >= %s",
+            (SHARD_SIZE, changed_since)
+        )
+        changed = {row[0] for row in cur.fetchall()}
+        changed.update(range(max(_shard_lastmods), shard_count))
+        for shard in sorted(changed):
+            first_id, last_id = shard_bounds(shard)
+            cur.execute(
+                "SELECT MAX(COALESCE(updated_at, published_at)) FROM news WHERE id BETWEEN %s AND %s",
+                (first_id, last_id)
+            )
+            _shard_lastmods[shard] = cur.fetchone()[0]
+    return [(shard, _shard_lastmods.get(shard)) for shard in range(shard_count)]
+
+def xml_response(entry: Dict[str, Any], event: Dict[str, Any], max_age: int) -> Dict[str, Any]:
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Cache-Control': f'public, max-age={max_age}',
+        **validator_headers(entry['etag'], entry['last_modified'])
+    }
+    if is_not_modified(event, entry['etag'], entry['last_modified']):
+        return {'statusCode': 304, 'headers': headers, 'isBase64Encoded': False, 'body': ''}
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/xml', **headers},
+        'isBase64Encoded': False,
+        'body': entry['body']
+    }
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Генерирует динамический sitemap.xml для SEO
-    Args: event - dict с httpMethod
+    Args: event - dict с httpMethod, queryStringParameters (shard)
           context - object с request_id
-    Returns: XML sitemap со всеми новостями
+    Returns: sitemap index или XML sitemap отдельного шарда новостей
     '''
+    global _index_cache
     method: str = event.get('httpMethod', 'GET')
     
     if method == 'OPTIONS':
@@ -19,7 +234,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': ''
@@ -41,65 +256,78 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'body': json.dumps({'error': 'DATABASE_URL not configured'})
             }
         
-        base_url = event.get('headers', {}).get('host', 'poehali.dev')
-        if not base_url.startswith('http'):
-            base_url = f'https://{base_url}'
+        base_url = SITE_URL
         
-        conn = psycopg2.connect(db_url)
-        cur = conn.cursor()
+        params = event.get('queryStringParameters') or {}
+        shard_param = params.get('shard')
         
-        cur.execute("""
-            SELECT id, slug, published_at, updated_at 
-            FROM news 
-            ORDER BY published_at DESC
-        """)
+        if shard_param == 'pages':
+            return xml_response({
+                'body': render_urlset(base_url, [], include_home=True),
+                'etag': build_etag(0, None, f'{base_url}|pages|{format_lastmod(None)}'),
+                'last_modified': None
+            }, event, 3600)
         
-        news_items = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        
-        xml_content += '  <url>\n'
-        xml_content += f'    <loc>{base_url}/</loc>\n'
-        xml_content += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-        xml_content += '    <changefreq>hourly</changefreq>\n'
-        xml_content += '    <priority>1.0</priority>\n'
-        xml_content += '  </url>\n'
-        
-        for item in news_items:
-            news_id, slug, published_at, updated_at = item
+        if shard_param is not None:
+            try:
+                shard = int(shard_param)
+            except ValueError:
+                shard = -1
+            if shard < 0:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'error': 'Invalid shard'})
+                }
             
-            news_url = f'{base_url}/news/{news_id}'
-            if slug:
-                news_url = f'{base_url}/news/{slug}'
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT MAX(id) FROM news")
+            max_id = cur.fetchone()[0] or 0
             
-            last_mod = updated_at or published_at
-            if last_mod:
-                last_mod_str = last_mod.strftime('%Y-%m-%d')
-            else:
-                last_mod_str = datetime.now().strftime('%Y-%m-%d')
+            if shard_bounds(shard)[0] > max_id:
+                cur.close()
+                release_db_connection(conn)
+                return {
+                    'statusCode': 404,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'error': 'Shard not found'})
+                }
             
-            xml_content += '  <url>\n'
-            xml_content += f'    <loc>{news_url}</loc>\n'
-            xml_content += f'    <lastmod>{last_mod_str}</lastmod>\n'
-            xml_content += '    <changefreq>daily</changefreq>\n'
-            xml_content += '    <priority>0.8</priority>\n'
-            xml_content += '  </url>\n'
+            cached = _shard_cache.get(shard)
+            if cached and cached['fingerprint'] == shard_fingerprint(cur, shard):
+                _shard_cache.move_to_end(shard)
+                entry = cached
+            else:
+                entry = load_shard(cur, base_url, shard)
+            cur.close()
+            release_db_connection(conn)
+            return xml_response(entry, event, 3600)
         
-        xml_content += '</urlset>'
+        conn = get_db_connection()
+        cur = conn.cursor()
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/xml',
-                'Access-Control-Allow-Origin': '*',
-                'Cache-Control': 'public, max-age=3600'
-            },
-            'isBase64Encoded': False,
-            'body': xml_content
+        cur.execute("SELECT COUNT(*), MAX(updated_at), MAX(id) FROM news")
+        total, last_modified, max_id = cur.fetchone()
+        etag = build_etag(total, last_modified, base_url)
+        
+        cached = _index_cache
+        if cached and cached['etag'] == etag:
+            cur.close()
+            release_db_connection(conn)
+            return xml_response(cached, event, 3600)
+        
+        shards = shard_lastmods(cur, max_id, cached['last_modified'] if cached else None) if max_id else []
+        cur.close()
+        release_db_connection(conn)
+        
+        entry = {
+            'body': render_index(base_url, shards),
+            'etag': etag,
+            'last_modified': last_modified
         }
+        _index_cache = entry
+        return xml_response(entry, event, 3600)
         
     except Exception as e:
         return {
@@ -0,0 +1,2 @@
+CREATE INDEX idx_news_category_published_id ON t_p74494482_auto_seo_news_site.news(category, published_at DESC, id DESC);
+CREATE INDEX idx_news_published_id ON t_p74494482_auto_seo_news_site.news(published_at DESC, id DESC);
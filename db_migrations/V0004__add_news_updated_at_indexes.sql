@@ -0,0 +1,2 @@
+CREATE INDEX idx_news_updated_at ON t_p74494482_auto_seo_news_site.news(updated_at DESC);
+CREATE INDEX idx_news_category_updated_at ON t_p74494482_auto_seo_news_site.news(category, updated_at DESC);
@@ -0,0 +1,24 @@
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.notify_news_inserted() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'news_inserted',
+        json_build_object(
+            'id', NEW.id,
+            'title', NEW.title,
+            'excerpt', left(NEW.excerpt, 600),
+            'category', NEW.category,
+            'image', NEW.image_url,
+            'author', NEW.author,
+            'time', NEW.published_at,
+            'isHot', NEW.is_hot,
+            'views', NEW.views_count,
+            'slug', NEW.slug
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_notify_inserted
+    AFTER INSERT ON t_p74494482_auto_seo_news_site.news
+    FOR EACH ROW EXECUTE FUNCTION t_p74494482_auto_seo_news_site.notify_news_inserted();
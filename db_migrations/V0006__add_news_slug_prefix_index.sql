@@ -0,0 +1 @@
+CREATE INDEX idx_news_slug_prefix ON t_p74494482_auto_seo_news_site.news(slug varchar_pattern_ops);
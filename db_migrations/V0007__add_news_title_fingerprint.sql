@@ -0,0 +1,22 @@
+ALTER TABLE t_p74494482_auto_seo_news_site.news ADD COLUMN title_fingerprint CHAR(32);
+
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.news_title_fingerprint(title TEXT) RETURNS CHAR(32) AS $$
+    SELECT md5(regexp_replace(lower(translate(title, 'Ёё', 'Ее')), '[^[:alnum:]]+', '', 'g'))::CHAR(32);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.set_news_title_fingerprint() RETURNS trigger AS $$
+BEGIN
+    NEW.title_fingerprint := t_p74494482_auto_seo_news_site.news_title_fingerprint(NEW.title);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_title_fingerprint
+    BEFORE INSERT OR UPDATE OF title ON t_p74494482_auto_seo_news_site.news
+    FOR EACH ROW EXECUTE FUNCTION t_p74494482_auto_seo_news_site.set_news_title_fingerprint();
+
+UPDATE t_p74494482_auto_seo_news_site.news
+SET title_fingerprint = t_p74494482_auto_seo_news_site.news_title_fingerprint(title)
+WHERE title_fingerprint IS NULL;
+
+CREATE INDEX idx_news_title_fingerprint ON t_p74494482_auto_seo_news_site.news(title_fingerprint);
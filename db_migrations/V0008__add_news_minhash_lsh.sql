@@ -0,0 +1,12 @@
+ALTER TABLE t_p74494482_auto_seo_news_site.news ADD COLUMN minhash_signature INTEGER[];
+
+CREATE TABLE IF NOT EXISTS t_p74494482_auto_seo_news_site.news_lsh_buckets (
+    news_id INTEGER NOT NULL REFERENCES t_p74494482_auto_seo_news_site.news(id) ON DELETE CASCADE,
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    published_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (news_id, band)
+);
+
+CREATE INDEX idx_news_lsh_buckets_lookup ON t_p74494482_auto_seo_news_site.news_lsh_buckets(band, bucket, category, published_at DESC);
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS t_p74494482_auto_seo_news_site.generation_jobs (
+    id SERIAL PRIMARY KEY,
+    dedup_key VARCHAR(100) NOT NULL,
+    category VARCHAR(100),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    outcome VARCHAR(50),
+    error TEXT,
+    latency_ms INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX idx_generation_jobs_pending_dedup ON t_p74494482_auto_seo_news_site.generation_jobs(dedup_key) WHERE status = 'pending';
+CREATE INDEX idx_generation_jobs_claim ON t_p74494482_auto_seo_news_site.generation_jobs(status, created_at);
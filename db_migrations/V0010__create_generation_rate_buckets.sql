@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS t_p74494482_auto_seo_news_site.generation_rate_buckets (
+    bucket_key VARCHAR(150) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
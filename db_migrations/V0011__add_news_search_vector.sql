@@ -0,0 +1,8 @@
+ALTER TABLE t_p74494482_auto_seo_news_site.news ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(excerpt, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(content, '')), 'C')
+    ) STORED;
+
+CREATE INDEX idx_news_search_vector ON t_p74494482_auto_seo_news_site.news USING GIN (search_vector);
@@ -0,0 +1,91 @@
+ALTER TABLE t_p74494482_auto_seo_news_site.news ADD COLUMN meta_keyword_set TEXT[]
+    GENERATED ALWAYS AS (
+        array_remove(regexp_split_to_array(lower(btrim(coalesce(meta_keywords, ''))), '\s*,\s*'), '')
+    ) STORED;
+
+CREATE TABLE IF NOT EXISTS t_p74494482_auto_seo_news_site.news_related (
+    news_id INTEGER NOT NULL REFERENCES t_p74494482_auto_seo_news_site.news(id) ON DELETE CASCADE,
+    related_id INTEGER NOT NULL REFERENCES t_p74494482_auto_seo_news_site.news(id) ON DELETE CASCADE,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (news_id, related_id)
+);
+
+CREATE INDEX idx_news_related_lookup ON t_p74494482_auto_seo_news_site.news_related(news_id, score DESC);
+
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.news_related_candidates(
+    p_id INTEGER, p_category VARCHAR, p_published_at TIMESTAMP, p_keywords TEXT[]
+) RETURNS TABLE (related_id INTEGER, score INTEGER) AS $$
+    SELECT c.id, cardinality(ARRAY(
+        SELECT unnest(c.meta_keyword_set) INTERSECT SELECT unnest(p_keywords)
+    ))
+    FROM (
+        SELECT n.id, n.published_at, n.meta_keyword_set
+        FROM t_p74494482_auto_seo_news_site.news n
+        WHERE n.category = p_category
+          AND n.published_at <= p_published_at
+          AND n.published_at > p_published_at - INTERVAL '30 days'
+          AND n.id <> p_id
+        ORDER BY n.published_at DESC, n.id DESC
+        LIMIT 200
+    ) c
+    WHERE c.meta_keyword_set && p_keywords
+    ORDER BY 2 DESC, c.published_at DESC
+    LIMIT 6
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.refresh_news_related() RETURNS trigger AS $$
+DECLARE
+    related RECORD;
+BEGIN
+    IF cardinality(NEW.meta_keyword_set) = 0 THEN
+        RETURN NEW;
+    END IF;
+
+    FOR related IN
+        SELECT c.related_id AS id, c.score
+        FROM t_p74494482_auto_seo_news_site.news_related_candidates(
+            NEW.id, NEW.category, coalesce(NEW.published_at, NOW()::timestamp), NEW.meta_keyword_set
+        ) c
+    LOOP
+        INSERT INTO t_p74494482_auto_seo_news_site.news_related (news_id, related_id, score)
+        VALUES (NEW.id, related.id, related.score), (related.id, NEW.id, related.score)
+        ON CONFLICT (news_id, related_id) DO UPDATE SET score = EXCLUDED.score;
+
+        DELETE FROM t_p74494482_auto_seo_news_site.news_related
+        WHERE news_id = related.id
+          AND related_id NOT IN (
+              SELECT r.related_id
+              FROM t_p74494482_auto_seo_news_site.news_related r
+              JOIN t_p74494482_auto_seo_news_site.news n ON n.id = r.related_id
+              WHERE r.news_id = related.id
+              ORDER BY r.score DESC, n.published_at DESC
+              LIMIT 6
+          );
+    END LOOP;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_related
+    AFTER INSERT ON t_p74494482_auto_seo_news_site.news
+    FOR EACH ROW EXECUTE FUNCTION t_p74494482_auto_seo_news_site.refresh_news_related();
+
+INSERT INTO t_p74494482_auto_seo_news_site.news_related (news_id, related_id, score)
+SELECT pair.news_id, pair.related_id, pair.score
+FROM t_p74494482_auto_seo_news_site.news n
+CROSS JOIN LATERAL t_p74494482_auto_seo_news_site.news_related_candidates(
+    n.id, n.category, n.published_at, n.meta_keyword_set
+) r
+CROSS JOIN LATERAL (VALUES (n.id, r.related_id, r.score), (r.related_id, n.id, r.score)) AS pair(news_id, related_id, score)
+WHERE cardinality(n.meta_keyword_set) > 0 AND n.published_at IS NOT NULL
+ON CONFLICT (news_id, related_id) DO NOTHING;
+
+DELETE FROM t_p74494482_auto_seo_news_site.news_related r
+USING (
+    SELECT r.news_id, r.related_id,
+           ROW_NUMBER() OVER (PARTITION BY r.news_id ORDER BY r.score DESC, n.published_at DESC) AS position
+    FROM t_p74494482_auto_seo_news_site.news_related r
+    JOIN t_p74494482_auto_seo_news_site.news n ON n.id = r.related_id
+) ranked
+WHERE ranked.news_id = r.news_id AND ranked.related_id = r.related_id AND ranked.position > 6;
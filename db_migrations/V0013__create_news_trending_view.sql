@@ -0,0 +1,20 @@
+CREATE MATERIALIZED VIEW t_p74494482_auto_seo_news_site.news_trending AS
+SELECT
+    news_id,
+    category,
+    score,
+    ROW_NUMBER() OVER (ORDER BY score DESC, news_id DESC) AS trending_rank,
+    NOW() AS refreshed_at
+FROM (
+    SELECT
+        id AS news_id,
+        category,
+        ((COALESCE(views_count, 0) + 1)
+            / POWER(GREATEST(EXTRACT(EPOCH FROM NOW() - published_at), 0) / 3600 + 2, 1.5))::DOUBLE PRECISION AS score
+    FROM t_p74494482_auto_seo_news_site.news
+    WHERE published_at > NOW() - INTERVAL '14 days'
+) scored;
+
+CREATE UNIQUE INDEX idx_news_trending_news_id ON t_p74494482_auto_seo_news_site.news_trending(news_id);
+CREATE INDEX idx_news_trending_score ON t_p74494482_auto_seo_news_site.news_trending(score DESC, news_id DESC);
+CREATE INDEX idx_news_trending_category_score ON t_p74494482_auto_seo_news_site.news_trending(category, score DESC, news_id DESC);
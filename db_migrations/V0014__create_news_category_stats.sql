@@ -0,0 +1,46 @@
+CREATE TABLE IF NOT EXISTS t_p74494482_auto_seo_news_site.news_category_stats (
+    category VARCHAR(100) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0,
+    newest_published_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO t_p74494482_auto_seo_news_site.news_category_stats (category, total, newest_published_at)
+SELECT category, COUNT(*), MAX(published_at)
+FROM t_p74494482_auto_seo_news_site.news
+GROUP BY category;
+
+CREATE OR REPLACE FUNCTION t_p74494482_auto_seo_news_site.refresh_news_category_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE t_p74494482_auto_seo_news_site.news_category_stats
+        SET total = total - 1,
+            newest_published_at = (
+                SELECT MAX(published_at) FROM t_p74494482_auto_seo_news_site.news WHERE category = OLD.category
+            ),
+            updated_at = NOW()
+        WHERE category = OLD.category;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO t_p74494482_auto_seo_news_site.news_category_stats AS s (category, total, newest_published_at, updated_at)
+        VALUES (NEW.category, 1, NEW.published_at, NOW())
+        ON CONFLICT (category) DO UPDATE
+        SET total = s.total + 1,
+            newest_published_at = GREATEST(s.newest_published_at, EXCLUDED.newest_published_at),
+            updated_at = NOW();
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_category_stats
+    AFTER INSERT OR DELETE ON t_p74494482_auto_seo_news_site.news
+    FOR EACH ROW EXECUTE FUNCTION t_p74494482_auto_seo_news_site.refresh_news_category_stats();
+
+CREATE TRIGGER trg_news_category_stats_update
+    AFTER UPDATE OF category, published_at ON t_p74494482_auto_seo_news_site.news
+    FOR EACH ROW
+    WHEN (OLD.category IS DISTINCT FROM NEW.category OR OLD.published_at IS DISTINCT FROM NEW.published_at)
+    EXECUTE FUNCTION t_p74494482_auto_seo_news_site.refresh_news_category_stats();
@@ -0,0 +1,73 @@
+'''
+Разовое заполнение minhash_signature и news_lsh_buckets для статей, опубликованных до
+миграции V0008. Без него проверка похожих новостей в auto-news первые
+SIMILARITY_WINDOW_DAYS дней после выкладки не видит уже существующие статьи окна.
+Обрабатываются только статьи окна без сигнатуры, так что повторный запуск безопасен.
+Запускается один раз при выкладке, после применения миграций.
+
+Запуск: DATABASE_URL=postgresql://... python scripts/backfill_minhash_lsh.py [batch_size]
+'''
+
+import os
+import sys
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from script_helpers import load_handler_module
+
+def backfill_batch(module, conn, after_id: int, batch_size: int) -> list:
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, title, excerpt, category, published_at
+        FROM t_p74494482_auto_seo_news_site.news
+        WHERE id > %s
+          AND minhash_signature IS NULL
+          AND published_at > NOW() - INTERVAL '{module.SIMILARITY_WINDOW_DAYS} days'
+        ORDER BY id
+        LIMIT %s
+    """, (after_id, batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        cursor.close()
+        return []
+
+    entries = [
+        (news_id, category, published_at, module.minhash_signature(f"{title} {excerpt or ''}"))
+        for news_id, title, excerpt, category, published_at in rows
+    ]
+    execute_values(
+        cursor,
+        """
+        UPDATE t_p74494482_auto_seo_news_site.news AS n
+        SET minhash_signature = v.signature
+        FROM (VALUES %s) AS v(id, signature)
+        WHERE n.id = v.id
+        """,
+        [(news_id, signature) for news_id, _, _, signature in entries],
+        template='(%s::int, %s::int[])'
+    )
+    module.store_lsh_buckets(cursor, entries)
+    conn.commit()
+    cursor.close()
+    return [row[0] for row in rows]
+
+if __name__ == '__main__':
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    auto_news = load_handler_module('auto-news')
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+
+    processed = 0
+    last_id = 0
+    try:
+        while True:
+            ids = backfill_batch(auto_news, conn, last_id, batch_size)
+            if not ids:
+                break
+            processed += len(ids)
+            last_id = ids[-1]
+            print(f'backfilled {processed} articles (up to id {last_id})')
+    finally:
+        conn.close()
+
+    print(f'done: {processed} articles')
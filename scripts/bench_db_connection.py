@@ -0,0 +1,35 @@
+'''
+Замер задержки get-news: холодное подключение к БД на каждый запрос против
+переиспользования соединения между тёплыми вызовами.
+
+Запуск: DATABASE_URL=postgresql://localhost/news python scripts/bench_db_connection.py [iterations]
+'''
+
+import os
+import sys
+import time
+
+from script_helpers import load_handler_module, report
+
+def measure(module, iterations: int, reuse: bool) -> list:
+    event = {'httpMethod': 'GET', 'queryStringParameters': {'limit': '20'}}
+    timings = []
+    for _ in range(iterations):
+        if not reuse and module._db_connection is not None:
+            module._db_connection.close()
+            module._db_connection = None
+        module._cache.clear()
+        started = time.perf_counter()
+        response = module.handler(event, None)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response['statusCode'] != 200:
+            raise RuntimeError(response['body'])
+    return timings
+
+if __name__ == '__main__':
+    if not os.environ.get('DATABASE_URL'):
+        sys.exit('DATABASE_URL is not set')
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    get_news = load_handler_module('get-news')
+    report('cold', measure(get_news, iterations, reuse=False))
+    report('warm', measure(get_news, iterations, reuse=True))
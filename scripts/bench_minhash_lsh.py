@@ -0,0 +1,85 @@
+'''
+Замер MinHash/LSH-проверки похожих новостей из auto-news на синтетическом корпусе:
+скорость построения сигнатур, поиск кандидатов через LSH-корзины против полного
+перебора, доля найденных перефразированных дублей и ложных срабатываний.
+
+Построение сигнатур идёт примерно 120-200 статей в секунду, поэтому по умолчанию корпус
+небольшой (2000 статей, 10-20 секунд); для замера на 100k передайте размер явно.
+
+Запуск: python scripts/bench_minhash_lsh.py [corpus_size] [queries]
+'''
+
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from script_helpers import build_vocabulary, load_handler_module, random_words
+
+def synthetic_article(rng: random.Random, vocabulary: list) -> str:
+    return f'{random_words(rng, vocabulary, 8)}. {random_words(rng, vocabulary, 30)}'
+
+def paraphrase(rng: random.Random, vocabulary: list, text: str, ratio: float) -> str:
+    words = text.split()
+    for _ in range(int(len(words) * ratio)):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return ' '.join(words)
+
+def timed(callable_, *args):
+    started = time.perf_counter()
+    result = callable_(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+if __name__ == '__main__':
+    corpus_size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    auto_news = load_handler_module('auto-news')
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(rng, 20000)
+    
+    corpus = [synthetic_article(rng, vocabulary) for _ in range(corpus_size)]
+    started = time.perf_counter()
+    signatures = [auto_news.minhash_signature(text) for text in corpus]
+    build_seconds = time.perf_counter() - started
+    print(f'signatures: {corpus_size} in {build_seconds:.1f} s ({corpus_size / build_seconds:.0f}/s)')
+    
+    index = defaultdict(list)
+    for news_id, signature in enumerate(signatures):
+        for band, bucket in enumerate(auto_news.lsh_buckets(signature)):
+            index[(band, bucket)].append(news_id)
+    
+    def lsh_lookup(signature):
+        candidates = set()
+        for band, bucket in enumerate(auto_news.lsh_buckets(signature)):
+            candidates.update(index.get((band, bucket), ()))
+        return [news_id for news_id in candidates
+                if auto_news.signature_similarity(signature, signatures[news_id]) >= auto_news.SIMILARITY_THRESHOLD]
+    
+    def brute_force(signature):
+        return [news_id for news_id, other in enumerate(signatures)
+                if auto_news.signature_similarity(signature, other) >= auto_news.SIMILARITY_THRESHOLD]
+    
+    lsh_timings = []
+    found_duplicates = 0
+    false_positives = 0
+    for i in range(queries):
+        if i % 2 == 0:
+            source_id = rng.randrange(corpus_size)
+            text = paraphrase(rng, vocabulary, corpus[source_id], 0.15)
+        else:
+            source_id = None
+            text = synthetic_article(rng, vocabulary)
+        matches, elapsed = timed(lsh_lookup, auto_news.minhash_signature(text))
+        lsh_timings.append(elapsed)
+        if source_id is not None and source_id in matches:
+            found_duplicates += 1
+        if source_id is None and matches:
+            false_positives += 1
+    
+    brute_timings = [timed(brute_force, signatures[rng.randrange(corpus_size)])[1] for _ in range(5)]
+    
+    print(f'lsh lookup   p50={statistics.median(lsh_timings):9.2f} ms  max={max(lsh_timings):9.2f} ms')
+    print(f'brute force  p50={statistics.median(brute_timings):9.2f} ms  max={max(brute_timings):9.2f} ms')
+    print(f'recall: {found_duplicates}/{(queries + 1) // 2} paraphrased duplicates, '
+          f'false positives: {false_positives}/{queries // 2} fresh articles')
@@ -0,0 +1,73 @@
+'''
+Замер скорости записи сгенерированных новостей: построчный save_news (INSERT и COMMIT
+на каждую статью) против NewsBatchWriter (execute_values и один COMMIT на пачку).
+Обе ветки выполняют одинаковые проверки дублей, тестовые строки удаляются в конце.
+
+Запуск: DATABASE_URL=postgresql://localhost/news python scripts/bench_news_writer.py [rows] [flush_size]
+'''
+
+import os
+import random
+import sys
+import time
+import uuid
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from script_helpers import build_vocabulary, load_handler_module, random_words
+
+def synthetic_articles(rng: random.Random, marker: str, count: int) -> list:
+    vocabulary = build_vocabulary(rng, 20000)
+    articles = []
+    for number in range(count):
+        category = rng.choice(['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта'])
+        articles.append((category, {
+            'title': f'{marker} {number} ' + random_words(rng, vocabulary, 6),
+            'excerpt': random_words(rng, vocabulary, 30),
+            'content': random_words(rng, vocabulary, 600),
+            'meta_keywords': f'{category}, бенчмарк'
+        }))
+    return articles
+
+def measure_single_row(module, conn, articles: list) -> float:
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    for category, news_data in articles:
+        module.save_news(cursor, conn, category, news_data)
+    elapsed = time.perf_counter() - started
+    cursor.close()
+    return elapsed
+
+def measure_batched(module, conn, articles: list, flush_size: int) -> float:
+    cursor = conn.cursor()
+    writer = module.NewsBatchWriter(cursor, conn, flush_size=flush_size)
+    started = time.perf_counter()
+    for category, news_data in articles:
+        writer.add(category, news_data)
+    writer.flush()
+    elapsed = time.perf_counter() - started
+    cursor.close()
+    return elapsed
+
+if __name__ == '__main__':
+    if not os.environ.get('DATABASE_URL'):
+        sys.exit('DATABASE_URL is not set')
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    flush_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    marker = f'Бенчмарк записи {uuid.uuid4().hex[:8]}'
+    auto_news = load_handler_module('auto-news')
+    rng = random.Random(42)
+    conn = psycopg2.connect(os.environ['DATABASE_URL'], cursor_factory=RealDictCursor)
+
+    try:
+        single_seconds = measure_single_row(auto_news, conn, synthetic_articles(rng, f'{marker} single', rows))
+        batched_seconds = measure_batched(auto_news, conn, synthetic_articles(rng, f'{marker} batch', rows), flush_size)
+        print(f'single-row  {rows / single_seconds:8.1f} rows/s  ({single_seconds:.2f} s)')
+        print(f'batched     {rows / batched_seconds:8.1f} rows/s  ({batched_seconds:.2f} s, flush every {flush_size})')
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM t_p74494482_auto_seo_news_site.news WHERE title LIKE %s', (f'{marker}%',))
+        conn.commit()
+        conn.close()
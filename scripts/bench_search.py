@@ -0,0 +1,101 @@
+'''
+Замер задержки полнотекстового поиска get-news (?q=) на 10k / 100k / 1M синтетических
+статей. Строки генерируются на стороне Postgres через generate_series, помечаются
+автором-маркером и удаляются в конце. Время обработчика включает запрос валидатора
+ETag (COUNT(*)/MAX(updated_at) по всей таблице), поэтому его стоимость замеряется
+и выводится отдельной строкой. Триггеры на время вставки и удаления отключаются
+через session_replication_role (счётчики news_category_stats остаются согласованными),
+поэтому нужна роль с правами суперпользователя (локальная БД).
+
+Запуск: DATABASE_URL=postgresql://localhost/news python scripts/bench_search.py [iterations]
+'''
+
+import os
+import sys
+import time
+import uuid
+
+import psycopg2
+
+from script_helpers import load_handler_module, report
+
+SIZES = [10000, 100000, 1000000]
+QUERIES = ['искусственный интеллект', 'рынок криптовалют', 'финал турнира', 'выставка искусства', 'саммит -климат']
+WORDS = [
+    'искусственный', 'интеллект', 'рынок', 'криптовалюта', 'биткоин', 'турнир', 'финал', 'команда',
+    'выставка', 'искусство', 'саммит', 'климат', 'экономика', 'инфляция', 'технологии', 'смартфон',
+    'игра', 'релиз', 'инвесторы', 'прогноз', 'аналитики', 'правительство', 'соглашение', 'рост'
+]
+
+def grow_corpus(conn, marker: str, start: int, stop: int) -> None:
+    cursor = conn.cursor()
+    cursor.execute("SET session_replication_role = replica")
+    cursor.execute("""
+        INSERT INTO t_p74494482_auto_seo_news_site.news (title, excerpt, content, category, author, slug, published_at)
+        SELECT
+            (SELECT string_agg(w, ' ') FROM (SELECT (%(words)s::text[])[1 + floor(random() * %(word_count)s)::int] AS w
+                                            FROM generate_series(1, 6) WHERE g >= 0) t),
+            (SELECT string_agg(w, ' ') FROM (SELECT (%(words)s::text[])[1 + floor(random() * %(word_count)s)::int] AS w
+                                            FROM generate_series(1, 30) WHERE g >= 0) t),
+            (SELECT string_agg(w, ' ') FROM (SELECT (%(words)s::text[])[1 + floor(random() * %(word_count)s)::int] AS w
+                                            FROM generate_series(1, 300) WHERE g >= 0) t),
+            (ARRAY['IT', 'Игры', 'Экономика', 'Технологии', 'Спорт', 'Культура', 'Мир', 'Криптовалюта'])[1 + g %% 8],
+            %(marker)s,
+            %(marker)s || '-' || g,
+            NOW() - g * INTERVAL '1 minute'
+        FROM generate_series(%(start)s, %(stop)s - 1) AS g
+    """, {'words': WORDS, 'word_count': len(WORDS), 'marker': marker, 'start': start, 'stop': stop})
+    cursor.execute("SET session_replication_role = DEFAULT")
+    cursor.execute("ANALYZE t_p74494482_auto_seo_news_site.news")
+    conn.commit()
+    cursor.close()
+
+def measure(module, iterations: int) -> list:
+    timings = []
+    for i in range(iterations):
+        module._cache.clear()
+        event = {'httpMethod': 'GET', 'queryStringParameters': {'q': QUERIES[i % len(QUERIES)], 'limit': '20'}}
+        started = time.perf_counter()
+        response = module.handler(event, None)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response['statusCode'] != 200:
+            raise RuntimeError(response['body'])
+    return timings
+
+def measure_validator(conn, iterations: int) -> list:
+    timings = []
+    cursor = conn.cursor()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        cursor.execute('SELECT COUNT(*), MAX(updated_at) FROM t_p74494482_auto_seo_news_site.news')
+        cursor.fetchone()
+        timings.append((time.perf_counter() - started) * 1000)
+    conn.rollback()
+    cursor.close()
+    return timings
+
+if __name__ == '__main__':
+    if not os.environ.get('DATABASE_URL'):
+        sys.exit('DATABASE_URL is not set')
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    marker = f'bench-search-{uuid.uuid4().hex[:8]}'
+    get_news = load_handler_module('get-news')
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+
+    try:
+        inserted = 0
+        for size in SIZES:
+            grow_corpus(conn, marker, inserted, size)
+            inserted = size
+            measure(get_news, len(QUERIES))
+            handler_timings = measure(get_news, iterations)
+            validator_timings = measure_validator(conn, iterations)
+            report(f'{size:,} rows handler', handler_timings)
+            report(f'{size:,} rows validator', validator_timings)
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute("SET session_replication_role = replica")
+        cursor.execute('DELETE FROM t_p74494482_auto_seo_news_site.news WHERE author = %s', (marker,))
+        conn.commit()
+        conn.close()
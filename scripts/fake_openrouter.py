@@ -0,0 +1,142 @@
+'''
+Локальная заглушка OpenRouter chat/completions для проверки auto-news без реального LLM.
+Отвечает JSON-статьёй с уникальным заголовком и текстом (случайные фразы из словаря,
+сид - номер статьи) после искусственной задержки.
+При "stream": true отдаёт ответ SSE-чанками, растягивая задержку на весь поток,
+и пишет в лог, если клиент оборвал поток раньше конца (досрочная отмена).
+С --repeat-titles заголовки повторяются, чтобы проверить отмену по дублю.
+Пакетный промпт ("в JSON-массиве") получает массив статей по списку категорий.
+
+Запуск: python scripts/fake_openrouter.py --port 8099 --delay 2 [--chunk-size 24] [--repeat-titles]
+Затем:  OPENROUTER_URL=http://localhost:8099/api/v1/chat/completions
+'''
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ADJECTIVES = [
+    'новый', 'крупный', 'частный', 'городской', 'северный', 'молодой', 'цифровой', 'зимний', 'научный',
+    'морской', 'сельский', 'быстрый', 'тихий', 'ночной', 'солнечный', 'редкий', 'мобильный', 'лесной',
+    'речной', 'горный', 'старый', 'южный', 'торговый', 'детский', 'весенний', 'облачный', 'квантовый'
+]
+NOUNS = [
+    'стартап', 'музей', 'клуб', 'банк', 'завод', 'театр', 'порт', 'университет', 'фестиваль', 'рынок',
+    'спутник', 'марафон', 'оркестр', 'аэропорт', 'бюджет', 'реактор', 'чемпионат', 'процессор', 'архив',
+    'заповедник', 'мост', 'дирижабль', 'фонд', 'роботакси', 'телескоп', 'виноградник', 'трамвай', 'симфонист'
+]
+VERBS = [
+    'запустил', 'открыл', 'показал', 'отменил', 'расширил', 'купил', 'построил', 'выиграл', 'представил',
+    'закрыл', 'обновил', 'перенёс', 'удвоил', 'продал', 'испытал', 'сократил', 'объединил', 'поддержал'
+]
+PLACES = [
+    'в Казани', 'в Новосибирске', 'на Камчатке', 'в Калининграде', 'под Тверью', 'в Якутске', 'в Сочи',
+    'на Урале', 'в Мурманске', 'в Иркутске', 'в Самаре', 'на Алтае', 'во Владивостоке', 'в Пскове'
+]
+
+_counter = itertools.count(1)
+_counter_lock = threading.Lock()
+
+def next_article_number() -> int:
+    with _counter_lock:
+        return next(_counter)
+
+def build_sentence(rng: random.Random) -> str:
+    words = [rng.choice(ADJECTIVES), rng.choice(NOUNS), rng.choice(VERBS), rng.choice(ADJECTIVES),
+             rng.choice(NOUNS), rng.choice(PLACES)]
+    sentence = ' '.join(words)
+    return sentence[0].upper() + sentence[1:] + '.'
+
+def build_article(category: str, repeat_titles: bool) -> dict:
+    number = next_article_number()
+    rng = random.Random(number)
+    title = build_sentence(rng).rstrip('.')
+    excerpt = ' '.join(build_sentence(rng) for _ in range(3))
+    return {
+        'title': f'Тестовая новость {category}' if repeat_titles else title,
+        'excerpt': excerpt,
+        'content': '\n\n'.join(' '.join(build_sentence(rng) for _ in range(4)) for _ in range(6)),
+        'meta_title': title,
+        'meta_description': excerpt,
+        'meta_keywords': f'{category}, {rng.choice(NOUNS)}, {rng.choice(NOUNS)}',
+        'category': category
+    }
+
+class FakeOpenRouterHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    chunk_size = 24
+    repeat_titles = False
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        batch = re.search(r'по порядку: (.+)\.', prompt)
+        if batch:
+            articles = [build_article(category, self.repeat_titles) for category in re.findall(r'"([^"]+)"', batch.group(1))]
+            content = json.dumps(articles, ensure_ascii=False)
+        else:
+            match = re.search(r'категории "([^"]+)"', prompt)
+            category = match.group(1) if match else 'IT'
+            content = json.dumps(build_article(category, self.repeat_titles), ensure_ascii=False)
+        if request.get('stream'):
+            self.stream_content(content)
+            return
+
+        time.sleep(self.delay)
+        body = json.dumps({
+            'choices': [{'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'completion_tokens': len(content) // 4}
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_content(self, content: str):
+        chunks = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        sent = 0
+        try:
+            self.wfile.write(b': OPENROUTER PROCESSING\n\n')
+            for chunk in chunks:
+                time.sleep(self.delay / len(chunks))
+                event = {'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': chunk}}]}
+                self.wfile.write(f'data: {json.dumps(event)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+                sent += len(chunk)
+            usage = {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                     'usage': {'completion_tokens': len(content) // 4}}
+            self.wfile.write(f'data: {json.dumps(usage)}\n\ndata: [DONE]\n\n'.encode('utf-8'))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            print(f'stream aborted by client after {sent}/{len(content)} chars')
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--delay', type=float, default=2.0)
+    parser.add_argument('--chunk-size', type=int, default=24)
+    parser.add_argument('--repeat-titles', action='store_true')
+    args = parser.parse_args()
+
+    FakeOpenRouterHandler.delay = args.delay
+    FakeOpenRouterHandler.chunk_size = args.chunk_size
+    FakeOpenRouterHandler.repeat_titles = args.repeat_titles
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), FakeOpenRouterHandler)
+    print(f'Fake OpenRouter listening on http://127.0.0.1:{args.port}/api/v1/chat/completions')
+    server.serve_forever()
@@ -0,0 +1,31 @@
+'''
+Общие помощники скриптов замеров и обслуживания: загрузка обработчика облачной функции
+из backend/<имя>/index.py, вывод перцентилей задержки и синтетический текст для корпусов.
+'''
+
+import importlib.util
+import os
+import random
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SYLLABLES = ['ра', 'но', 'ти', 'ко', 'ле', 'ма', 'вы', 'ст', 'пр', 'ин', 'ов', 'ет', 'ал', 'ск', 'де', 'ру']
+
+def load_handler_module(function_name: str):
+    path = os.path.join(ROOT, 'backend', function_name, 'index.py')
+    spec = importlib.util.spec_from_file_location(f'{function_name.replace("-", "_")}_index', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f'{label:<22} p50={statistics.median(ordered):8.2f} ms  p95={p95:8.2f} ms  max={ordered[-1]:8.2f} ms')
+
+def build_vocabulary(rng: random.Random, size: int) -> list:
+    return list({''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))) for _ in range(size)})
+
+def random_words(rng: random.Random, vocabulary: list, count: int) -> str:
+    return ' '.join(rng.choice(vocabulary) for _ in range(count))
@@ -0,0 +1,52 @@
+'''
+Нагрузочная проверка выделения slug: много параллельных вставок с одинаковым заголовком
+должны завершиться без ошибок уникальности и получить разные slug.
+
+Запуск: DATABASE_URL=postgresql://localhost/news python scripts/stress_slug_allocation.py [writers]
+'''
+
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from script_helpers import load_handler_module
+
+def insert_one(module, title: str) -> str:
+    conn = psycopg2.connect(os.environ['DATABASE_URL'], cursor_factory=RealDictCursor)
+    try:
+        cursor = conn.cursor()
+        result = module.insert_news_with_unique_slug(cursor, {
+            'title': title,
+            'category': 'IT',
+            'author': 'Редакция'
+        }, module.create_slug(title), max_attempts=50)
+        conn.commit()
+        return result['slug']
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    if not os.environ.get('DATABASE_URL'):
+        sys.exit('DATABASE_URL is not set')
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    title = f'Нагрузочный тест slug {uuid.uuid4().hex[:8]}'
+
+    for function_name in ('news', 'auto-news'):
+        module = load_handler_module(function_name)
+        with ThreadPoolExecutor(max_workers=writers) as executor:
+            slugs = list(executor.map(lambda _: insert_one(module, title), range(writers)))
+
+        duplicates = len(slugs) - len(set(slugs))
+        print(f'{function_name}: {len(slugs)} inserts, {len(set(slugs))} unique slugs, {duplicates} duplicates')
+        if duplicates:
+            sys.exit(1)
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM t_p74494482_auto_seo_news_site.news WHERE title = %s', (title,))
+    conn.commit()
+    conn.close()
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Helmet } from 'react-helmet-async';
 import { Button } from '@/components/ui/button';
@@ -24,6 +24,7 @@ const categories = [
 ];
 
 const API_URL = 'https://functions.poehali.dev/d4635673-3760-41d9-9a96-ec32f8a0294c';
+const NEWS_PAGE_SIZE = 50;
 
 const formatTime = (isoDate: string) => {
   if (!isoDate) return 'Недавно';
@@ -56,9 +57,11 @@ const Index = () => {
   const [loading, setLoading] = useState(false);
   const [expandedNewsId, setExpandedNewsId] = useState<number | null>(null);
   const [totalNewsCount, setTotalNewsCount] = useState(newsData.length);
+  const [categoryCounts, setCategoryCounts] = useState<Record<string, number>>({});
   const [serverStatus, setServerStatus] = useState<string>('Новости загружены из кэша');
   const [apiAttempts, setApiAttempts] = useState(0);
   const [notifications, setNotifications] = useState<Array<{id: string, message: string, type: 'info' | 'success' | 'warning' | 'error', timestamp: Date}>>([]);
+  const watermarkRef = useRef<string | null>(null);
 
   const addNotification = (message: string, type: 'info' | 'success' | 'warning' | 'error' = 'info') => {
     const id = Date.now().toString();
@@ -79,6 +82,10 @@ const Index = () => {
     return () => clearInterval(pollInterval);
   }, [activeCategory]);
 
+  useEffect(() => {
+    fetchCategoryCounts();
+  }, []);
+
   useEffect(() => {
     const filtered = activeCategory === 'Главная' 
       ? newsData 
@@ -88,6 +95,7 @@ const Index = () => {
 
   const fetchNews = async () => {
     setLoading(true);
+    watermarkRef.current = null;
     setApiAttempts(prev => prev + 1);
     try {
       const url = activeCategory === 'Главная' 
@@ -120,6 +128,7 @@ const Index = () => {
       if (data && Array.isArray(data.news)) {
         setNews(data.news);
         setTotalNewsCount(data.count || data.news.length);
+        watermarkRef.current = data.news[0]?.id != null ? String(data.news[0].id) : null;
         setServerStatus(`✅ Загружено ${data.news.length} новостей с сервера`);
         addNotification(`Успешно загружено ${data.news.length} новостей с сервера`, 'success');
       } else {
@@ -142,15 +151,45 @@ const Index = () => {
     }
   };
   
+  const fetchCategoryCounts = async () => {
+    try {
+      const response = await fetch(`${API_URL}?facets=1`);
+      if (!response.ok) return;
+      
+      const data = await response.json();
+      if (data && Array.isArray(data.facets)) {
+        const counts: Record<string, number> = { 'Главная': data.total };
+        data.facets.forEach((facet: any) => {
+          counts[facet.category] = facet.count;
+        });
+        setCategoryCounts(counts);
+      }
+    } catch (error) {
+      console.log('Счётчики категорий недоступны');
+    }
+  };
+  
   const fetchNewsSilently = async () => {
     try {
-      const url = activeCategory === 'Главная' 
-        ? API_URL 
-        : `${API_URL}?category=${encodeURIComponent(activeCategory)}`;
+      const watermark = watermarkRef.current;
+      const params = new URLSearchParams();
+      if (activeCategory !== 'Главная') {
+        params.set('category', activeCategory);
+      }
+      if (watermark) {
+        params.set('since', watermark);
+      }
+      const query = params.toString();
+      const url = query ? `${API_URL}?${query}` : API_URL;
       
       const response = await fetch(url);
       
       if (!response.ok) {
+        if (response.status === 400 && watermark) {
+          watermarkRef.current = null;
+          setServerStatus('🔄 Фоновое обновление: требуется полная синхронизация');
+          return;
+        }
         setServerStatus('🔄 Фоновое обновление: сервер недоступен');
         return;
       }
@@ -158,9 +197,20 @@ const Index = () => {
       const data = await response.json();
       
       if (data && Array.isArray(data.news)) {
-        setNews(data.news);
-        setTotalNewsCount(data.count || data.news.length);
-        setServerStatus(`🔄 Обновлено: ${data.news.length} новостей`);
+        if (watermark) {
+          if (data.news.length > 0) {
+            const freshIds = new Set(data.news.map((n: any) => n.id));
+            setNews(prev => [...data.news, ...prev.filter(n => !freshIds.has(n.id))].slice(0, NEWS_PAGE_SIZE));
+            setTotalNewsCount(prev => prev + data.news.length);
+          }
+          watermarkRef.current = data.watermark || watermark;
+          setServerStatus(`🔄 Обновлено: ${data.news.length} новых новостей`);
+        } else {
+          setNews(data.news);
+          setTotalNewsCount(data.count || data.news.length);
+          watermarkRef.current = data.news[0]?.id != null ? String(data.news[0].id) : null;
+          setServerStatus(`🔄 Обновлено: ${data.news.length} новостей`);
+        }
       }
     } catch (error) {
       console.log('Фоновое обновление пропущено');
@@ -230,6 +280,9 @@ const Index = () => {
                 >
                   <Icon name={cat.icon} size={16} />
                   {cat.name}
+                  {categoryCounts[cat.name] !== undefined && (
+                    <span className="text-xs opacity-60">{categoryCounts[cat.name]}</span>
+                  )}
                 </Button>
               ))}
             </nav>
@@ -259,6 +312,9 @@ const Index = () => {
                   >
                     <Icon name={cat.icon} size={16} />
                     {cat.name}
+                    {categoryCounts[cat.name] !== undefined && (
+                      <span className="text-xs opacity-60">{categoryCounts[cat.name]}</span>
+                    )}
                   </Button>
                 ))}
               </div>
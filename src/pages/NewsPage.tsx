@@ -8,6 +8,7 @@ import SEOHead from '@/components/SEOHead';
 import StructuredData from '@/components/StructuredData';
 
 const API_URL = 'https://functions.poehali.dev/f9026a29-c4a5-479e-9712-5966f2b1a425';
+const GET_NEWS_URL = 'https://functions.poehali.dev/d4635673-3760-41d9-9a96-ec32f8a0294c';
 
 const formatTime = (isoDate: string) => {
   if (!isoDate) return 'Недавно';
@@ -36,15 +37,15 @@ const NewsPage = () => {
   const fetchNews = async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${API_URL}?id=${id}`);
+      const lookup = /^\d+$/.test(id || '') ? `id=${id}` : `slug=${encodeURIComponent(id || '')}`;
+      const response = await fetch(`${GET_NEWS_URL}?${lookup}&include=related`);
       if (!response.ok) throw new Error('News not found');
       const data = await response.json();
       setNews(data.news);
+      setRelatedNews(data.related || []);
       
-      if (data.news?.category) {
-        const relatedResponse = await fetch(`${API_URL}?category=${encodeURIComponent(data.news.category)}&limit=3`);
-        const relatedData = await relatedResponse.json();
-        setRelatedNews(relatedData.news.filter((n: any) => n.id !== parseInt(id || '0')));
+      if (data.news?.id) {
+        fetch(`${API_URL}?action=view&id=${data.news.id}`, { method: 'POST', keepalive: true }).catch(() => {});
       }
     } catch (error) {
       console.error('Error fetching news:', error);